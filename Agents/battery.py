@@ -1,10 +1,6 @@
- 
 from __future__ import annotations
-from Agents.cable import Cable
-import copy
+from typing import Optional
 import mesa
-import copy
-import pandas as pd
  
 class Battery(mesa.Agent):
     def __init__(self, unique_id: int, model: mesa.model,
@@ -14,42 +10,65 @@ class Battery(mesa.Agent):
         self.y = y  # y coordinate
         self.capacity = energy  # total capacity of battery
         self.energy = energy  # remaining energy
-        self.houses: list[House] = [] #
-        self.all_paths = [[(x, y)]]
-        self.copy_paths: list[list[tuple[int, int]]] = []
+        
+        # houses in order of connection and their coordinates in path
+        # order, both by house id
+        self.house_map: dict[int, House] = {}
+        self.path_map: dict[int, tuple[int, int]] = {}
+        
+        # lists of the houses and paths, made again after a change
+        self.house_list: Optional[list[House]] = None
+        self.path_list: Optional[list[list[tuple[int, int]]]] = None
+        
+        self.num_cables = 0  # number of cables of the last lay-out
     
-    def copy_all_paths(self) -> None:
+    @property
+    def houses(self) -> list[House]:
         """
-        This function deepcopy's all paths of battery
+        This function gives the houses in order of connection, the list may
+        not be changed
         """
         
-        self.copy_paths = copy.deepcopy(self.all_paths)
- 
+        if self.house_list is None:
+            self.house_list = list(self.house_map.values())
+        
+        return self.house_list
+    
+    @property
+    def all_paths(self) -> list[list[tuple[int, int]]]:
+        """
+        This function gives the paths, the first is the battery and the
+        others are the houses until the paths are merged
+        """
+        
+        if self.path_list is None:
+            self.path_list = [[(self.x, self.y)]]
+            self.path_list += [[point] for point in self.path_map.values()]
+        
+        return self.path_list
+    
+    @all_paths.setter
+    def all_paths(self, paths: list[list[tuple[int, int]]]) -> None:
+        self.path_list = paths
+    
     def lay_cables(self) -> int:
         """
         This function will draw all the cables from the houses to the Battery
         """
         
         # remove duplicates
-        path = pd.unique(self.all_paths[0])
-        
-        # create and place the cables
-        for i, point in enumerate(path):
-            # create new cable
-            cable = Cable(i + 150*self.unique_id, self.model, point[0], point[1], self.unique_id)
-            
-            # place cable in grid
-            self.model.grid.place_agent(cable, point)
-            
-            # add cable to the model's cable list
-            self.model.cables.append(cable)
-            
-        # add all cables to number of cables
-        return i + 1
+        path = list(dict.fromkeys(self.all_paths[0]))
+        
+        # replace the cables of the last lay-out of the battery
+        self.model.cable_segments.remove(self.unique_id)
+        self.num_cables = self.model.cable_segments.add(self.unique_id, path)
+        
+        return self.num_cables
  
     def add_house(self, house: House) -> None:
         """
-        This function adds a not connected house
+        This function adds a not connected house, its coordinate is the
+        last path
 
         Args:
             house (House): a not connected house
@@ -58,41 +77,59 @@ class Battery(mesa.Agent):
         # reduce energy of the battery
         self.energy -= house.energy
         
-        # append the house to the houses list
-        self.houses.append(house)
-        
         # connect the house
         house.connect(self)
         
-        # append the coordinate of the house to the paths property
-        self.all_paths.append([(house.x, house.y)])
+        # append the house and its coordinate to the houses and paths
+        self.house_map[house.unique_id] = house
+        self.path_map[house.unique_id] = (house.x, house.y)
+        self.house_list = None
+        self.path_list = None
  
     def remove_house(self, house: House) -> None:
         """
-        This function removes a house from the battery
+        This function removes a house from the battery, the other houses
+        and paths keep their order
 
         Args:
             house (House): a connected house
         """
         
-        # remove house from the houses list
-        self.houses.remove(house)
+        # remove house and its coordinate by id
+        del self.house_map[house.unique_id]
+        del self.path_map[house.unique_id]
+        self.house_list = None
+        self.path_list = None
         
         # add the house's energy to the battery's energy
         self.energy += house.energy
         
-        # remove the house coordinates from the paths
-        self.all_paths.remove([(house.x, house.y)])
-        
         # remove connection
         house.connection = None
     
-    def get_len_paths(self) -> int:
+    def set_houses(self, houses: list[House],
+                   path_houses: Optional[list[House]] = None) -> None:
         """
-        This function gives the length of the remaining paths
+        This function replaces all houses of the battery
 
-        Returns:
-            int: number of paths remaining
+        Args:
+            houses (list[House]): the new houses in order of connection
+            path_houses (Optional[list[House]]): the same houses in the
+                                                 order of their paths, the
+                                                 order of connection if None
         """
         
-        return len(self.all_paths)
+        # reset the battery to an empty battery
+        self.house_map = {}
+        self.path_map = {}
+        self.energy = self.capacity
+        
+        # connect the new houses
+        for house in houses:
+            self.add_house(house)
+        
+        # keep the given order of the paths
+        if path_houses is not None:
+            self.path_map = {house.unique_id: (house.x, house.y)
+                             for house in path_houses}
+            self.path_list = None
@@ -3,14 +3,14 @@
 from __future__ import annotations
 import mesa
 import random
-from Agents.cable import Cable
+from cable_segments import CableSegments
 from Agents.house import House
 from Agents.battery import Battery
+from baseline_runner import monte_carlo, SEED
 from typing import Union, Optional
-import csv
+from district import read_objects
+from lay_cables import unique_points
 import matplotlib.pyplot as plt
-import copy
-import pandas as pd
 import numpy as np
 
 
@@ -20,6 +20,7 @@ class SmartGrid(mesa.Model):
         self.batteries = self.add_objects(district, 'batteries')
         self.objects = self.houses + self.batteries
         self.num_cables = 0
+        self.cable_segments = CableSegments()
         self.success = True
         self.costs_grid = 0
 
@@ -62,49 +63,18 @@ class SmartGrid(mesa.Model):
             Union[list[House], list[Battery]]: a list with all the houses or batteries
         """
 
-        # path to data
-        path = 'Huizen&Batterijen/district_' + str(district) + '/district-' + str(district) + '_' +  info + '.csv'
-
-        # list with the information
+        # the district is parsed once per process
         lst = []
-
-        # add the information to the list
-        with open(path, 'r') as csv_file:
-            data = csv.reader(csv_file)
-
-            # index to skip header
-            count = 0
-
-            # go through all rows except the first
-            for line in data:
-                # skip header
-                if count == 0:
-                    count += 1
-                    continue
-
-                # convert the data to a neat list with floats
-                if not line[0].isnumeric():
-                    neat_data = line[0].split(',')
-                    line = neat_data + [line[1]]
-
-                # information
-                x = int(line[0])
-                y = int(line[1])
-                energy = float(line[2])
-
-                # append a house or Battery
-                if info == 'houses':
-                    lst.append(House(count, self, x, y, energy))
-                else:
-                    lst.append(Battery(count, self, x, y, energy))
-
-                count += 1
+        for count, (x, y, energy) in enumerate(read_objects(district, info), 1):
+            # append a house or Battery
+            if info == 'houses':
+                lst.append(House(count, self, x, y, energy))
+            else:
+                lst.append(Battery(count, self, x, y, energy))
 
         return lst
 
     def lay_cable_random(self) -> None:
-        cable_id = 1000
-        
         random.shuffle(self.houses)
         
         for house in self.houses:
@@ -147,23 +117,25 @@ class SmartGrid(mesa.Model):
             path = horizontal + vertical
             
             # remove the dublicate coordinates at turns
-            path = pd.unique(path).tolist()
+            path = unique_points(path)
                           
-            for space in path:
-                # add cable to the house
-                self.addCable(space[0], space[1], house, cable_id)
-                cable_id += 1
+            # add cables to the house
+            self.add_cables(house, path)
 
-    def addCable(self, x: int, y: int, house: House, cable_id: int) -> None:
-        new_cable = Cable(cable_id, self, x, y, house.connection.unique_id)
-        new_cable.battery_connection = house.connection
-        house.add_cable(new_cable)
+    def add_cables(self, house: House, points: list[tuple[int, int]]) -> None:
+        """
+        This function lays the cables of a house on unique points
 
+        Args:
+            house (House): a connected house
+            points (list[tuple[int, int]]): points of the cables
+        """
+        
+        battery_id = house.connection.unique_id
+        
         # update number of cables
-        self.num_cables += 1
-
-        # place cable in the grid
-        self.grid.place_agent(new_cable, (x, y))
+        self.num_cables += self.cable_segments.add(battery_id, points,
+                                                   house.unique_id)
         
     def costs(self) -> Optional[int]:
         if self.success == False:
@@ -177,24 +149,14 @@ class SmartGrid(mesa.Model):
     
 
 if __name__ == "__main__":
-    results = []
-    fails = 0
+    import pandas as pd
     
     runs = 1000
-    for i in range(runs):
-        test_wijk_1 = SmartGrid(1)
-        if test_wijk_1.costs() != None:
-            results.append(test_wijk_1.costs())
-        else:
-            fails += 1
+    stats = monte_carlo('baseline', 1, runs, "baseline_data.csv", seed=SEED)
+    print(stats['perc_fails'])
     
-    perc_fails = (fails / runs) * 100
-    print(perc_fails)
+    # the last row is the percentage of fails
+    results = pd.read_csv("baseline_data.csv", index_col=0)["Costs"][:-1]
     
     plt.hist(results, bins=20)
-    plt.show()
-    
-    results.append(perc_fails)
-    
-    df = pd.DataFrame(results, columns = ["Costs"])
-    df.to_csv("baseline_data.csv")
\ No newline at end of file
+    plt.show()
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+This python file runs the random baselines as a Monte Carlo batch in
+parallel processes, the costs are written to the csv file in chunks
+"""
+
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+import csv
+import importlib
+import random
+
+# number of runs one worker does at once
+CHUNK_SIZE = 1000
+
+# seed for the seeds of the chunks, a batch is the same on every run
+SEED = 0
+
+
+def run_chunk(baseline: str, district: int, runs: int,
+              seed: int) -> list[Optional[int]]:
+    """
+    This function runs a chunk of random baselines in a worker process
+
+    Args:
+        baseline (str): module of the baseline, 'baseline' or 'baseline2'
+        district (int): district number
+        runs (int): number of runs
+        seed (int): seed of the chunk
+
+    Returns:
+        list[Optional[int]]: costs of every run, None if the run failed
+    """
+
+    # the district is loaded once per process
+    SmartGrid = importlib.import_module(baseline).SmartGrid
+    random.seed(seed)
+
+    return [SmartGrid(district).costs() for i in range(runs)]
+
+
+def monte_carlo(baseline: str, district: int, runs: int, output: str,
+                chunk: int = CHUNK_SIZE, seed: Optional[int] = SEED,
+                workers: Optional[int] = None) -> dict[str, Any]:
+    """
+    This function runs random baselines in chunks in parallel, every chunk
+    has its own seed so a batch can be repeated with any number of workers.
+    The costs of the successful runs are written to output as they come
+    in, followed by the percentage of failed runs
+
+    Args:
+        baseline (str): module of the baseline, 'baseline' or 'baseline2'
+        district (int): district number
+        runs (int): number of runs
+        output (str): path of the csv file
+        chunk (int): number of runs per chunk
+        seed (Optional[int]): seed for the seeds of the chunks, random if
+                              None
+        workers (Optional[int]): number of processes, one per cpu if None
+
+    Returns:
+        dict[str, Any]: number of runs and fails, percentage of fails and
+        the lowest and mean costs
+    """
+
+    sizes = [min(chunk, runs - start) for start in range(0, runs, chunk)]
+    seeds = random.Random(seed).sample(range(2 ** 31), len(sizes))
+
+    stats = {'runs': runs, 'fails': 0, 'perc_fails': 0.0,
+             'min': None, 'mean': None}
+    total = 0
+    index = 0
+
+    with open(output, 'w', newline='') as csv_file, \
+         ProcessPoolExecutor(workers) as executor:
+        writer = csv.writer(csv_file)
+        writer.writerow(['', 'Costs'])
+
+        # the chunks come back in order, so the file is the same every time
+        for results in executor.map(run_chunk, [baseline] * len(sizes),
+                                    [district] * len(sizes), sizes, seeds):
+            costs = [cost for cost in results if cost is not None]
+            stats['fails'] += len(results) - len(costs)
+
+            writer.writerows((index + i, float(cost)) for i, cost in enumerate(costs))
+            index += len(costs)
+            csv_file.flush()
+
+            if costs:
+                total += sum(costs)
+                if stats['min'] is None or min(costs) < stats['min']:
+                    stats['min'] = min(costs)
+
+        stats['perc_fails'] = (stats['fails'] / runs) * 100
+        writer.writerow([index, stats['perc_fails']])
+
+    if index:
+        stats['mean'] = total / index
+
+    return stats
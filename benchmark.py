@@ -0,0 +1,101 @@
+"""
+This python file times every stage of the smartgrid on synthetic
+districts of growing size and writes the timings to a json report
+"""
+
+from __future__ import annotations
+from typing import Any
+import json
+import platform
+import random
+import time
+from district import load_district
+from smartgrid2 import SmartGrid
+from synthetic import generate_district
+
+# houses, batteries and grid size of every benchmark, 150 houses is the
+# size of the bundled districts
+SIZES = [(150, 5, 51), (1_000, 33, 131), (10_000, 333, 411)]
+
+# stages of the smartgrid in every report, repair runs inside link_houses
+# and takes no time when all houses fit
+STAGES = ('loading', 'create_grid', 'placement_order', 'link_houses',
+          'repair', 'lay_cables', 'optimization', 'get_information')
+
+def benchmark(houses: int, batteries: int, size: int, iteration: int = 100,
+              seed: int = 0) -> dict[str, Any]:
+    """
+    This function times the stages of a smartgrid on a synthetic district
+
+    Args:
+        houses (int): number of houses
+        batteries (int): number of batteries
+        size (int): width and height of the grid
+        iteration (int): number of iterations of the optimization
+        seed (int): seed of the district and of the optimization
+
+    Returns:
+        dict[str, Any]: the district, the time of every stage, the costs and
+        the number of houses which could not be placed, the costs leave
+        those houses out
+    """
+
+    district = generate_district(houses, batteries, size, size, seed=seed)
+
+    # the csv file is parsed once, later models use the cached arrays
+    start = time.perf_counter()
+    load_district(district, 'houses')
+    load_district(district, 'batteries')
+    timings = {'parse': time.perf_counter() - start}
+
+    random.seed(seed)
+    start = time.perf_counter()
+    model = SmartGrid(district, incremental=True, iteration=iteration,
+                      profile=True)
+    timings['total'] = time.perf_counter() - start
+
+    # the stages are the spans of the profiler, a stage that did not run
+    # took no time
+    timings.update(dict.fromkeys(STAGES, 0.0))
+    for stage, span in model.profile['spans'].items():
+        timings[stage] = span['seconds']
+
+    return {'district': district, 'houses': houses, 'batteries': batteries,
+            'size': size, 'iteration': iteration, 'seed': seed,
+            'timings': timings, 'counters': model.profile['counters'],
+            'costs': model.costs(),
+            'not_placed': len(model.houses_not_placed)}
+
+def run_benchmarks(output: str, sizes: list[tuple[int, int, int]] = SIZES,
+                   iteration: int = 100, seed: int = 0) -> list[dict[str, Any]]:
+    """
+    This function benchmarks all sizes and writes the report to output
+
+    Args:
+        output (str): path of the json report
+        sizes (list[tuple[int, int, int]]): houses, batteries and grid size
+        iteration (int): number of iterations of the optimization
+        seed (int): seed of the districts and of the optimization
+
+    Returns:
+        list[dict[str, Any]]: the result of every size
+    """
+
+    results = []
+
+    for houses, batteries, size in sizes:
+        results.append(benchmark(houses, batteries, size, iteration, seed))
+
+    report = {'python': platform.python_version(),
+              'machine': platform.machine(),
+              'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'results': results}
+
+    with open(output, 'w') as outfile:
+        json.dump(report, outfile, indent=2)
+
+    return results
+
+if __name__ == "__main__":
+    for result in run_benchmarks("benchmark.json"):
+        print(result['houses'], "houses:", json.dumps(result['timings']))
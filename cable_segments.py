@@ -0,0 +1,235 @@
+"""
+This python file contains the compact cables of a smartgrid, the cables are
+kept as horizontal and vertical runs in a NumPy array instead of a mesa
+agent per cell, Cable agents are only built for the mesa visualisation
+"""
+
+from __future__ import annotations
+from typing import Iterable, Optional
+import numpy as np
+from Agents.cable import Cable
+
+# columns of a segment: battery id, house id, first and last cell of the run
+BATTERY, HOUSE, X_1, Y_1, X_2, Y_2 = range(6)
+
+# house id of the cables which are shared by all houses of a battery
+SHARED = 0
+
+
+def runs(cells: np.ndarray) -> np.ndarray:
+    """
+    This function splits cells into straight runs of neighbouring cells,
+    the cells keep the order in which they were added
+
+    Args:
+        cells (np.ndarray): (N, 4) battery id, house id, x and y of cells
+
+    Returns:
+        np.ndarray: (S, 6) battery id, house id, first and last cell of
+        every run
+    """
+
+    if len(cells) == 0:
+        return np.empty((0, 6), dtype=np.int64)
+
+    # a step to a neighbouring cell of the same battery and house
+    step = np.diff(cells[:, X_1:], axis=0)
+    neighbour = ((np.diff(cells[:, :X_1], axis=0) == 0).all(axis=1) &
+                 (np.abs(step).sum(axis=1) == 1))
+
+    # a run ends where the step after its second cell changes direction
+    turn = np.zeros(len(step), dtype=bool)
+    turn[1:] = neighbour[:-1] & (step[1:] != step[:-1]).any(axis=1)
+
+    new_run = np.ones(len(cells), dtype=bool)
+    new_run[1:] = ~neighbour | turn
+    start = np.flatnonzero(new_run)
+    end = np.append(start[1:], len(cells)) - 1
+
+    return np.hstack((cells[start], cells[end, X_1:]))
+
+
+def segment_cells(x_1: int, y_1: int, x_2: int, y_2: int) -> list[tuple[int, int]]:
+    """
+    This function gives the cells of a horizontal or vertical run
+
+    Args:
+        x_1 (int): x coordinate of the first cell
+        y_1 (int): y coordinate of the first cell
+        x_2 (int): x coordinate of the last cell
+        y_2 (int): y coordinate of the last cell
+
+    Returns:
+        list[tuple[int, int]]: the cells from the first to the last cell
+    """
+
+    if y_1 == y_2:
+        step = 1 if x_2 >= x_1 else -1
+        return [(x, y_1) for x in range(x_1, x_2 + step, step)]
+
+    step = 1 if y_2 >= y_1 else -1
+    return [(x_1, y) for y in range(y_1, y_2 + step, step)]
+
+
+class CableSegments:
+    def __init__(self) -> None:
+        # cells added since the runs were last built, as battery id,
+        # house id and cells
+        self.pending: list[tuple[int, int, list[tuple[int, int]]]] = []
+        self.segments = np.empty((0, 6), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.array())
+
+    def array(self) -> np.ndarray:
+        """
+        This function gives all segments, the added cells are split into
+        runs all at once
+
+        Returns:
+            np.ndarray: (S, 6) battery id, house id, first and last cell of
+            every segment
+        """
+
+        if self.pending:
+            ids = np.repeat(np.array([added[:2] for added in self.pending], dtype=np.int64),
+                            [len(added[2]) for added in self.pending], axis=0)
+            points = np.array([point for added in self.pending for point in added[2]],
+                              dtype=np.int64).reshape(-1, 2)
+            self.segments = np.vstack((self.segments, runs(np.hstack((ids, points)))))
+            self.pending = []
+
+        return self.segments
+
+    def add(self, battery_id: int, points: Iterable[tuple[int, int]],
+            house_id: int = SHARED) -> int:
+        """
+        This function adds the cables on unique cells, in the order of the
+        cables
+
+        Args:
+            battery_id (int): id of the battery the cables go to
+            points (Iterable[tuple[int, int]]): unique cells of the cables
+            house_id (int): id of the house of the cables, SHARED if they
+                            belong to all houses of the battery
+
+        Returns:
+            int: number of added cables
+        """
+
+        points = list(points)
+        self.pending.append((battery_id, house_id, points))
+
+        return len(points)
+
+    def remove(self, battery_id: int) -> None:
+        """
+        This function removes all cables of a battery
+
+        Args:
+            battery_id (int): id of the battery
+        """
+
+        self.pending = [added for added in self.pending if added[0] != battery_id]
+        self.segments = self.segments[self.segments[:, BATTERY] != battery_id]
+
+    def select(self, battery_id: Optional[int] = None,
+               house_id: Optional[int] = None) -> np.ndarray:
+        """
+        This function gives the segments of a battery or of a house
+
+        Args:
+            battery_id (Optional[int]): id of the battery, all if None
+            house_id (Optional[int]): id of the house, all if None
+
+        Returns:
+            np.ndarray: (S, 6) the selected segments
+        """
+
+        segments = self.array()
+
+        if battery_id is not None:
+            segments = segments[segments[:, BATTERY] == battery_id]
+        if house_id is not None:
+            segments = segments[segments[:, HOUSE] == house_id]
+
+        return segments
+
+    @staticmethod
+    def count(segments: np.ndarray) -> int:
+        """
+        This function counts the cables of segments
+
+        Args:
+            segments (np.ndarray): (S, 6) segments
+
+        Returns:
+            int: number of cells of all segments
+        """
+
+        return int((np.abs(segments[:, X_2] - segments[:, X_1]) +
+                    np.abs(segments[:, Y_2] - segments[:, Y_1]) + 1).sum())
+
+    def num_cables(self, battery_id: Optional[int] = None,
+                   house_id: Optional[int] = None) -> int:
+        return self.count(self.select(battery_id, house_id))
+
+    def cells(self, battery_id: Optional[int] = None,
+              house_id: Optional[int] = None) -> list[tuple[int, int]]:
+        """
+        This function gives the cells of the cables of a battery or a house
+
+        Args:
+            battery_id (Optional[int]): id of the battery, all if None
+            house_id (Optional[int]): id of the house, all if None
+
+        Returns:
+            list[tuple[int, int]]: a cell per cable, in segment order
+        """
+
+        cells = []
+
+        for segment in self.select(battery_id, house_id)[:, X_1:].tolist():
+            cells += segment_cells(*segment)
+
+        return cells
+
+    def cells_by_house(self) -> dict[int, list[tuple[int, int]]]:
+        """
+        This function gives the cells of the cables of every house at once
+
+        Returns:
+            dict[int, list[tuple[int, int]]]: a cell per cable by house id,
+            the shared cables are under SHARED
+        """
+
+        cells: dict[int, list[tuple[int, int]]] = {}
+
+        for segment in self.array()[:, HOUSE:].tolist():
+            cells.setdefault(segment[0], []).extend(segment_cells(*segment[1:]))
+
+        return cells
+
+    def place_agents(self, model) -> list[Cable]:
+        """
+        This function builds a Cable agent for every cable and places it on
+        the grid of the model, for the mesa visualisation
+
+        Args:
+            model (SmartGrid): the smartgrid of the cables
+
+        Returns:
+            list[Cable]: the placed agents
+        """
+
+        agents = []
+
+        for segment in self.array().tolist():
+            battery_id = segment[BATTERY]
+
+            for point in segment_cells(*segment[X_1:]):
+                cable = Cable(len(agents), model, point[0], point[1], battery_id)
+                model.grid.place_agent(cable, point)
+                agents.append(cable)
+
+        return agents
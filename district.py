@@ -0,0 +1,117 @@
+"""
+This python file loads the houses and batteries of a district into
+compact arrays, the parsed csv files are cached in .npz files next to them
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Union
+import csv
+import os
+import tempfile
+import numpy as np
+
+# folder with the district files
+DATA_PATH = 'Huizen&Batterijen'
+
+
+def csv_path(district: Union[int, str], info: str) -> str:
+    """
+    This function gives the path of the csv file of a district
+
+    Args:
+        district (Union[int, str]): district number or name of a
+                                   synthetic district
+        info (str): 'houses' or 'batteries'
+
+    Returns:
+        str: path of the csv file
+    """
+
+    return os.path.join(DATA_PATH, 'district_' + str(district),
+                        'district-' + str(district) + '_' + info + '.csv')
+
+
+def parse_csv(path: str) -> np.ndarray:
+    """
+    This function parses a csv file of houses or batteries
+
+    Args:
+        path (str): path of the csv file
+
+    Returns:
+        np.ndarray: (N, 3) x, y and energy or capacity of every object
+    """
+
+    rows = []
+
+    with open(path, 'r') as csv_file:
+        data = csv.reader(csv_file)
+
+        # skip header
+        next(data)
+
+        for line in data:
+            # the position of a battery is one quoted "x,y" field
+            if not line[0].isnumeric():
+                line = line[0].split(',') + [line[1]]
+
+            rows.append((int(line[0]), int(line[1]), float(line[2])))
+
+    return np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+
+
+@lru_cache(maxsize=None)
+def load_district(district: Union[int, str], info: str) -> np.ndarray:
+    """
+    This function loads the houses or batteries of a district, the .npz
+    cache is used when it is newer than the csv file and written otherwise
+
+    Args:
+        district (Union[int, str]): district number or name of a
+                                   synthetic district
+        info (str): 'houses' or 'batteries'
+
+    Returns:
+        np.ndarray: (N, 3) x, y and energy or capacity of every object,
+        the array may not be changed
+    """
+
+    path = csv_path(district, info)
+    cache = os.path.splitext(path)[0] + '.npz'
+
+    if (os.path.exists(cache) and
+        os.path.getmtime(cache) >= os.path.getmtime(path)):
+        with np.load(cache) as data:
+            array = data['objects']
+    else:
+        array = parse_csv(path)
+
+        # write to a temporary file first, other processes may be reading
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path),
+                                             suffix='.npz')
+        with os.fdopen(handle, 'wb') as npz_file:
+            np.savez(npz_file, objects=array)
+        os.replace(temporary, cache)
+
+    array.setflags(write=False)
+
+    return array
+
+
+def read_objects(district: Union[int, str], info: str) -> list[tuple[int, int, float]]:
+    """
+    This function gives the houses or batteries of a district to build
+    agents from
+
+    Args:
+        district (Union[int, str]): district number or name of a
+                                   synthetic district
+        info (str): 'houses' or 'batteries'
+
+    Returns:
+        list[tuple[int, int, float]]: x, y and energy of every object
+    """
+
+    return [(int(x), int(y), float(energy))
+            for x, y, energy in load_district(district, info)]
@@ -1,88 +1,54 @@
 from Agents.battery import Battery
-import pandas as pd
-import copy
+from typing import Iterable, Union
+from path_index import PathIndex
+from numpy_distances import PathArray
+from route_cache import RouteCache, ROUTE_CACHE, PathCache, PATH_CACHE
+from profiler import PROFILER
+from steiner import steiner_cells, MAX_TERMINALS
+import heapq
 
-def dist_points(point_1: tuple[int, int], point_2: tuple[int, int]) -> int:
-    """
-    This function calculates the Manhattan distance between 2 points
-
-    Args:
-        point_1 (tuple[int, int]): a point
-        point_2 (tuple[int, int]): another point
+# distance engines by name, the indexes of the paths which are merged
+ENGINES = {'scalar': PathIndex, 'numpy': PathArray}
 
-    Returns:
-        int: the manhattan distance between the points
+def unique_points(points: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
     """
-    
-    return abs(point_1[0] - point_2[0]) + abs(point_1[1] - point_2[1])
-
-def dist_paths(path_1: list[tuple[int, int]],
-               path_2: list[tuple[int, int]]) -> tuple[int, tuple[int, int], tuple[int, int]]:
-    """
-    This function calculates the shortest distance between 2 paths
+    This function removes the duplicate points of a path, the first time a
+    point occurs is kept
 
     Args:
-        path_1 (list[tuple[int, int]]): a path
-        path_2 (list[tuple[int, int]]): another path
+        points (Iterable[tuple[int, int]]): points of a path
 
     Returns:
-        int: shortest Manhattan distance between the paths
+        list[tuple[int, int]]: the unique points in order
     """
-    
-    min_dist = -1
-    
-    for point_1 in path_1:
-        for point_2 in path_2:
-            dist = dist_points(point_1, point_2)
-            if  dist < min_dist or min_dist == -1:
-                min_dist = dist
-                best_point_1 = point_1
-                best_point_2 = point_2
-                
-    return min_dist, best_point_1, best_point_2
 
-def min_dist_paths(path: list[tuple[int, int]], battery: Battery) -> int:
-    """
-    This function calculates the shortest distance between a path
-    and the path in battery
+    return list(dict.fromkeys(points))
 
-    Args:
-        path (list[tuple[int, int]]): a path
-        battery (Battery): a battery
-
-    Returns:
-        int: shortest manhattan distance between path and the battery path
-    """
-    
-    # initialize minimum distance
-    min_dist = -1
-    
-    # find minimum distance between path and all other paths
-    for other_path in battery.copy_paths:
-        
-        # mim distance between 2 paths
-        dist, point_1, point_2 = dist_paths(other_path, path)
-        
-        # update minimum distance when new minimum is found
-        if min_dist == -1 or dist < min_dist:
-            min_dist = dist
-
-    return min_dist
-      
 def get_path(point_1: tuple[int, int],
-             point_2: tuple[int, int], info: bool) -> list[tuple[int, int]]:
+             point_2: tuple[int, int], info: bool,
+             cache: PathCache = PATH_CACHE) -> tuple[tuple[int, int], ...]:
     """
-    This function creates a path hor-ver or ver-hor depending on info
+    This function creates a path hor-ver or ver-hor depending on info, the
+    paths are remembered because the same points are connected again every
+    time the cables are laid
 
     Args:
         point_1 (tuple[int, int]): a point
         point_2 (tuple[int, int]): another point
         info (int): flag for which combination path
+        cache (PathCache): cache of paths, bounded by their number of cells
 
     Returns:
-        list[tuple[int, int]]: a path
+        tuple[tuple[int, int], ...]: a path, shared by all calls with the
+        same points while it is remembered
     """
     
+    key = (point_1, point_2, info)
+    path = cache.get(key)
+    
+    if path is not None:
+        return path
+    
     # determine smallest and biggest x and y values
     small_x, small_y = min(point_1[0], point_2[0]), min(point_1[1], point_2[1])
     big_x, big_y = max(point_1[0], point_2[0]), max(point_1[1], point_2[1])
@@ -91,91 +57,237 @@ def get_path(point_1: tuple[int, int],
     if info:
         vertical = [(point_1[0], i) for i in range(small_y, big_y + 1)]
         horizonal = [(i, point_2[1]) for i in range(small_x, big_x + 1)]
-        return list(pd.unique(vertical + horizonal))
+        path = unique_points(vertical + horizonal)
+    else:
+        horizonal = [(i, point_1[1]) for i in range(small_x, big_x + 1)]
+        vertical = [(point_2[0], i) for i in range(small_y, big_y + 1)]
+        path = unique_points(vertical + horizonal)
     
-    horizonal = [(i, point_1[1]) for i in range(small_x, big_x + 1)]
-    vertical = [(point_2[0], i) for i in range(small_y, big_y + 1)]
-    return list(pd.unique(vertical + horizonal))
+    return cache.put(key, path)
 
-def get_best_path(point_1: tuple[int, int], point_2: tuple[int, int],
-                  battery: Battery) -> list[tuple[int, int]]:
+def choose_path(point_1: tuple[int, int], point_2: tuple[int, int],
+                other_indexes: list[Union[PathIndex, PathArray]]
+                ) -> tuple[tuple[int, int], ...]:
     """
-    This function 
+    This function chooses the path between 2 points which is closest
+    to the other paths
 
     Args:
         point_1 (tuple[int, int]): a point
         point_2 (tuple[int, int]): another point
-        battery (Battery): a battery
+        other_indexes (list[Union[PathIndex, PathArray]]): the indexed
+                                                           paths which are
+                                                           not being merged,
+                                                           of any engine
 
     Returns:
-        list[tuple[int, int]]: the best path
+        tuple[tuple[int, int], ...]: the best path
     """
     
     # get both paths
     path_1 = get_path(point_1, point_2, True)
     path_2 = get_path(point_1, point_2, False)
     
-    # if only 2 paths left, it doesn't matter which path we choose
-    if battery.get_len_paths() <= 2:
-        return path_1
-    
+    # calculate the distances of both cases
+    dist_1, dist_2 = -1, -1
     
-    # calculate the distances of bothe cases
-    dist_1 = min_dist_paths(path_1, battery)
-    dist_2 = min_dist_paths(path_2, battery)
+    for index in other_indexes:
+        # only distances smaller than the minimum are found
+        dist, best_point_1, best_point_2 = index.dist(path_1, dist_1)
+        if dist != -1:
+            dist_1 = dist
+        
+        dist, best_point_1, best_point_2 = index.dist(path_2, dist_2)
+        if dist != -1:
+            dist_2 = dist
     
     # return the smallest distance
     if dist_1 < dist_2:
         return path_1
     return path_2
 
-def merge_paths(battery: Battery, index_1: int, index_2: int,
-                path: list[tuple[int, int]]) -> None:
-    
-    # combine both paths and remove duplicates
-    battery.all_paths[index_2] += battery.all_paths[index_1] + path
-    
-    # delete the old path
-    del battery.all_paths[index_1]
+def merge_battery_paths(battery: Battery, router: str = 'greedy',
+                        engine: str = 'scalar') -> None:
+    """
+    This function merges all paths of the battery into one path
+
+    Args:
+        battery (Battery): a battery
+        router (str): routing engine, a key of ROUTERS
+        engine (str): distance engine of the greedy router, a key of ENGINES
+    """
     
-    # copy path
-    battery.copy_paths = copy.deepcopy(battery.all_paths)
+    battery.all_paths = [list(merged_cells(battery.all_paths, router=router,
+                                           engine=engine))]
 
-def create_merged_path(battery: Battery) -> None:
+def merge_all_paths(all_paths: list[list[tuple[int, int]]],
+                    engine: str = 'scalar') -> list[tuple[int, int]]:
     """
-    This function creates a merged path
+    This function merges paths into one path. The distances between all
+    pairs of paths are kept in a heap and the closest pair is merged first
+    (Kruskal), after a merge only the distances to the merged path are
+    updated. The given paths are not changed
 
     Args:
-        battery (Battery): a battery
+        all_paths (list[list[tuple[int, int]]]): the paths, the first is
+                                                 the battery
+        engine (str): 'scalar' or 'numpy' distance calculation
+
+    Returns:
+        list[tuple[int, int]]: the merged path, points can occur twice
     """
-    min_dist = -1
     
-    for i, path_1 in enumerate(battery.all_paths):
-        # stop at last path
-        if i == battery.get_len_paths() - 1:
-            break
+    # paths by their index in all_paths, a merged path keeps the biggest index
+    paths = dict(enumerate(all_paths))
+    indexes = {i: ENGINES[engine](path) for i, path in paths.items()}
+    
+    # distance and closest points for every pair of paths (i < j)
+    pairs: dict[tuple[int, int], tuple[int, tuple[int, int], tuple[int, int]]] = {}
+    heap: list[tuple[int, int, int]] = []
+    
+    for i in range(len(paths)):
+        for j in range(i + 1, len(paths)):
+            pairs[(i, j)] = indexes[j].dist(indexes[i].points)
+            heap.append((pairs[(i, j)][0], i, j))
+    
+    heapq.heapify(heap)
+    PROFILER.count('distance_evaluations', len(pairs))
+    
+    while len(paths) > 1:
+        dist, index_1, index_2 = heapq.heappop(heap)
+        
+        # skip pairs of which a path is already merged or which are outdated
+        if (index_1 not in paths or index_2 not in paths or
+            pairs[(index_1, index_2)][0] != dist):
+            continue
+        
+        dist, best_point_1, best_point_2 = pairs[(index_1, index_2)]
+        
+        # all other paths decide which path is the best
+        other_indexes = [index for k, index in indexes.items()
+                         if k != index_1 and k != index_2]
+        
+        if other_indexes:
+            path = choose_path(best_point_1, best_point_2, other_indexes)
+        else:
+            path = get_path(best_point_1, best_point_2, True)
+        
+        # the path is compared with the other paths, they with the merged path
+        PROFILER.count('merges')
+        PROFILER.count('distance_evaluations', 3 * len(other_indexes))
         
-        for not_j, path_2 in enumerate(battery.all_paths[i + 1:]):
-            # index for second path in self.all_paths
-            j = not_j + i + 1
+        # now connect the paths together and extend the index of the path
+        paths[index_2] = paths[index_2] + paths.pop(index_1) + list(path)
+        indexes[index_2].extend(indexes.pop(index_1).points)
+        indexes[index_2].extend(path)
+        
+        # the merged path is the closest of its parts and the new path
+        for k, index in indexes.items():
+            if k == index_2:
+                continue
+            
+            # orientate every pair from the smallest to the biggest index
+            candidates = []
+            for old_index in (index_1, index_2):
+                old_dist, point_1, point_2 = pairs.pop((min(k, old_index),
+                                                        max(k, old_index)))
+                if k > old_index:
+                    point_1, point_2 = point_2, point_1
+                candidates.append((old_dist, point_1, point_2))
+            
+            # the new path only matters when it is closer
+            dist, point_2, point_1 = index.dist(path, min(candidates)[0])
+            if dist != -1:
+                candidates.append((dist, point_1, point_2))
             
-            # find the indexes of closest points of 2 paths and the distance
-            dist, point_1, point_2 = dist_paths(path_1, path_2)
+            # the first point is on path k
+            dist, point_1, point_2 = min(candidates, key=lambda x: x[0])
             
-            # update data if new minimum is found
-            if min_dist == -1 or dist < min_dist:
-                min_dist = dist
-                index_1 = i
-                index_2 = j
-                best_point_1 = point_1
-                best_point_2 = point_2
-
-    # remove the chosen paths oout of the copy list
-    battery.copy_paths.pop(index_2)
-    battery.copy_paths.pop(index_1)
-    
-    # get best path between the found closest paths
-    path = get_best_path(best_point_1, best_point_2, battery)
-    
-    # now connect the paths together
-    merge_paths(battery, index_1, index_2, path)
\ No newline at end of file
+            if k < index_2:
+                pairs[(k, index_2)] = (dist, point_1, point_2)
+                heapq.heappush(heap, (dist, k, index_2))
+            else:
+                pairs[(index_2, k)] = (dist, point_2, point_1)
+                heapq.heappush(heap, (dist, index_2, k))
+    
+    return list(paths.values())[0]
+
+def greedy_cells(all_paths: list[list[tuple[int, int]]],
+                 engine: str = 'scalar') -> list[tuple[int, int]]:
+    """
+    This function routes the paths of a battery by merging the closest
+    paths first with L-shaped paths
+
+    Args:
+        all_paths (list[list[tuple[int, int]]]): the paths, the first is
+                                                 the battery
+        engine (str): 'scalar' or 'numpy' distance calculation
+
+    Returns:
+        list[tuple[int, int]]: the unique cells of the merged path
+    """
+    
+    return unique_points(merge_all_paths(all_paths, engine))
+
+def shortest_cells(all_paths: list[list[tuple[int, int]]],
+                   engine: str = 'scalar') -> list[tuple[int, int]]:
+    """
+    This function routes the paths of a battery as a Steiner tree and with
+    the greedy merge and keeps the one with the least cables, the heuristic
+    Steiner tree is sometimes longer. Batteries with more than MAX_TERMINALS
+    points are only merged greedily, the Steiner tree takes O(n^4) time
+
+    Args:
+        all_paths (list[list[tuple[int, int]]]): the paths, the first is
+                                                 the battery
+        engine (str): 'scalar' or 'numpy' distance calculation
+
+    Returns:
+        list[tuple[int, int]]: the unique cells of the shortest route
+    """
+    
+    greedy = greedy_cells(all_paths, engine)
+    
+    if sum(len(path) for path in all_paths) > MAX_TERMINALS:
+        PROFILER.count('steiner.skipped')
+        return greedy
+    
+    steiner = steiner_cells(all_paths)
+    
+    if len(steiner) <= len(greedy):
+        return steiner
+    
+    PROFILER.count('steiner.greedy_shorter')
+    return greedy
+
+# routing engines by name, they give the unique cable cells of the paths
+ROUTERS = {'greedy': greedy_cells, 'steiner': shortest_cells}
+
+def merged_cells(all_paths: list[list[tuple[int, int]]],
+                 cache: RouteCache = ROUTE_CACHE,
+                 router: str = 'greedy',
+                 engine: str = 'scalar') -> list[tuple[int, int]]:
+    """
+    This function gives the unique cells of the merged paths, the cache is
+    checked before the paths are merged
+
+    Args:
+        all_paths (list[list[tuple[int, int]]]): the paths, the first is
+                                                 the battery
+        cache (RouteCache): cache of routed batteries
+        router (str): routing engine, a key of ROUTERS
+        engine (str): distance engine of the greedy router, a key of ENGINES
+
+    Returns:
+        list[tuple[int, int]]: the unique cells of the merged path, the list
+        is shared with the cache and may not be changed
+    """
+    
+    key = cache.key(all_paths, router, engine)
+    cells = cache.get(key)
+    
+    if cells is None:
+        cells = ROUTERS[router](all_paths, engine)
+        cache.put(key, cells)
+    
+    return cells
@@ -0,0 +1,203 @@
+"""
+This python file runs the random baseline of baseline2 as a NumPy batch,
+thousands of random assignments are drawn at once and the cables of every
+battery are counted on a cover of the grid, no agents are built
+"""
+
+from __future__ import annotations
+from typing import Any, Optional
+import numpy as np
+from district import load_district
+
+# number of runs of which the cables are counted at once
+BATCH_SIZE = 1000
+
+# most cells of the covers and the routes that are counted at once
+BLOCK_SIZE = 1 << 22
+
+# costs of a cable and of a battery
+CABLE_COST = 9
+BATTERY_COST = 5000
+
+def route_cells(house_points: np.ndarray, battery_points: np.ndarray,
+                house: np.ndarray, battery: np.ndarray,
+                height: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    This function rasterizes the L-shaped routes of houses to batteries,
+    first horizontal along the house, then vertical to the battery, as
+    linear cell indices x * height + y
+
+    Args:
+        house_points (np.ndarray): (H, 2) coordinates of the houses
+        battery_points (np.ndarray): (B, 2) coordinates of the batteries
+        house (np.ndarray): (N,) house of every route
+        battery (np.ndarray): (N,) battery of every route
+        height (int): height of the grid
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: the route and the linear index of
+        every cell of the routes
+    """
+
+    house_x, house_y = house_points[house].T
+    battery_x, battery_y = battery_points[battery].T
+    dist_x = np.abs(house_x - battery_x)
+    length = dist_x + np.abs(house_y - battery_y) + 1
+
+    # the route of every cell and the position of the cell on its route
+    route = np.repeat(np.arange(len(house)), length)
+    step = np.arange(len(route)) - np.repeat(np.cumsum(length) - length, length)
+    horizontal = step <= dist_x[route]
+
+    # the vertical part goes from the row of the house to the battery
+    direction = np.where(battery_y >= house_y, 1, -1)
+    x = np.where(horizontal, np.minimum(house_x, battery_x)[route] + step,
+                 battery_x[route])
+    y = np.where(horizontal, house_y[route],
+                 house_y[route] + direction[route] * (step - dist_x[route]))
+
+    return route, x * height + y
+
+def assign_random(energy: np.ndarray, capacity: np.ndarray, runs: int,
+                  rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """
+    This function connects the houses of many runs at once like
+    lay_cable_random, the houses come in a random order and pick a random
+    battery, when it is full the next batteries are tried in turn
+
+    Args:
+        energy (np.ndarray): (H,) energy of the houses
+        capacity (np.ndarray): (B,) capacity of the batteries
+        runs (int): number of runs
+        rng (np.random.Generator): random number generator
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (runs, H) battery index per house and
+        (runs,) flags of the runs in which a house did not fit
+    """
+
+    num_houses, num_batteries = len(energy), len(capacity)
+    rows = np.arange(runs)
+
+    # random order of the houses and a random battery for every turn
+    order = rng.random((runs, num_houses)).argsort(axis=1)
+    destination = rng.integers(num_batteries, size=(runs, num_houses))
+
+    remaining = np.tile(capacity, (runs, 1))
+    assignment = np.full((runs, num_houses), -1, dtype=np.int64)
+    failed = np.zeros(runs, dtype=bool)
+
+    for step in range(num_houses):
+        house = order[:, step]
+        house_energy = energy[house]
+
+        # the chosen battery and then the next ones, the first that fits
+        candidates = (destination[:, step, None] + np.arange(num_batteries)) % num_batteries
+        fits = remaining[rows[:, None], candidates] - house_energy[:, None] >= 0
+        battery = candidates[rows, fits.argmax(axis=1)]
+
+        # a run fails when no battery fits
+        failed |= ~fits.any(axis=1)
+        ok = ~failed
+
+        remaining[rows[ok], battery[ok]] -= house_energy[ok]
+        assignment[rows[ok], house[ok]] = battery[ok]
+
+    return assignment, failed
+
+def count_cables(assignment: np.ndarray, house_points: np.ndarray,
+                 battery_points: np.ndarray, width: int, height: int,
+                 block: int = BLOCK_SIZE) -> np.ndarray:
+    """
+    This function counts the cells of the union of the routes of every
+    battery, cables to the same battery are shared. The routes of a block
+    of runs are marked on a cover of the grid per battery
+
+    Args:
+        assignment (np.ndarray): (runs, H) battery index per house
+        house_points (np.ndarray): (H, 2) coordinates of the houses
+        battery_points (np.ndarray): (B, 2) coordinates of the batteries
+        width (int): width of the grid
+        height (int): height of the grid
+        block (int): most cells of the covers and the routes at once
+
+    Returns:
+        np.ndarray: (runs,) number of cables
+    """
+
+    cells = width * height
+    cover_size = len(battery_points) * cells
+
+    # cells of the routes of a run, if every house goes to an average battery
+    length = (np.abs(house_points[:, None, 0] - battery_points[None, :, 0]) +
+              np.abs(house_points[:, None, 1] - battery_points[None, :, 1]))
+    route_size = (length.mean() + 1) * assignment.shape[1]
+    rows = max(1, int(block // max(cover_size, route_size)))
+    cables = np.zeros(len(assignment), dtype=np.int64)
+
+    for start in range(0, len(assignment), rows):
+        runs = assignment[start:start + rows]
+        run, house = np.nonzero(runs != -1)
+        battery = runs[run, house]
+        route, cell = route_cells(house_points, battery_points, house, battery, height)
+
+        cover = np.zeros((len(runs), cover_size), dtype=bool)
+        cover[run[route], battery[route] * cells + cell] = True
+        cables[start:start + rows] = np.count_nonzero(cover, axis=1)
+
+    return cables
+
+def random_baselines(district: int, runs: int, seed: Optional[int] = None,
+                     batch: int = BATCH_SIZE) -> dict[str, Any]:
+    """
+    This function runs random baselines of a district in batches
+
+    Args:
+        district (int): district number
+        runs (int): number of runs
+        seed (Optional[int]): seed of the random number generator
+        batch (int): number of runs per batch
+
+    Returns:
+        dict[str, Any]: costs of the successful runs, number and percentage
+        of fails and the distribution of the costs
+    """
+
+    houses = load_district(district, 'houses')
+    batteries = load_district(district, 'batteries')
+
+    house_points = houses[:, :2].astype(np.int64)
+    battery_points = batteries[:, :2].astype(np.int64)
+    width = int(max(house_points[:, 0].max(), battery_points[:, 0].max())) + 1
+    height = int(max(house_points[:, 1].max(), battery_points[:, 1].max())) + 1
+
+    rng = np.random.default_rng(seed)
+
+    costs = []
+    fails = 0
+
+    for start in range(0, runs, batch):
+        assignment, failed = assign_random(houses[:, 2], batteries[:, 2],
+                                           min(batch, runs - start), rng)
+        cables = count_cables(assignment[~failed], house_points, battery_points,
+                              width, height)
+        costs.append(CABLE_COST * cables + BATTERY_COST * len(batteries))
+        fails += int(failed.sum())
+
+    costs = np.concatenate(costs)
+    stats = {'costs': costs, 'runs': runs, 'fails': fails,
+             'perc_fails': (fails / runs) * 100}
+
+    if len(costs):
+        stats.update({'min': int(costs.min()), 'max': int(costs.max()),
+                      'mean': float(costs.mean()), 'std': float(costs.std()),
+                      'percentiles': dict(zip((5, 25, 50, 75, 95),
+                                              np.percentile(costs, (5, 25, 50, 75, 95))))})
+
+    return stats
+
+if __name__ == "__main__":
+    for district in (1, 2, 3):
+        stats = random_baselines(district, 100_000, seed=0)
+        print("district", district, "fails", stats['perc_fails'],
+              "mean", stats.get('mean'), "min", stats.get('min'))
@@ -0,0 +1,137 @@
+"""
+This python file calculates Manhattan distances between paths with NumPy,
+every path is stored as an (N, 2) integer array of points. PathArray has
+the same dist as a PathIndex, so the merge can use either of them
+"""
+
+from __future__ import annotations
+from typing import Iterable, Optional
+import numpy as np
+
+# maximum number of distances calculated at once
+BLOCK_SIZE = 1 << 20
+
+def to_array(path: list[tuple[int, int]]) -> np.ndarray:
+    """
+    This function converts a path to an (N, 2) integer array
+
+    Args:
+        path (list[tuple[int, int]]): a path
+
+    Returns:
+        np.ndarray: the points of the path
+    """
+
+    return np.asarray(path, dtype=np.int64).reshape(-1, 2)
+
+def dist_arrays(array_1: np.ndarray, array_2: np.ndarray
+                ) -> tuple[int, tuple[int, int], tuple[int, int]]:
+    """
+    This function calculates the shortest distance between 2 paths in
+    blocks of rows of the first path
+
+    Args:
+        array_1 (np.ndarray): a path
+        array_2 (np.ndarray): another path
+
+    Returns:
+        tuple[int, tuple[int, int], tuple[int, int]]: shortest Manhattan
+        distance and the closest points of both paths
+    """
+
+    min_dist = -1
+    rows = max(1, BLOCK_SIZE // max(1, len(array_2)))
+
+    for start in range(0, len(array_1), rows):
+        block = array_1[start:start + rows]
+
+        # distances between all points of the block and the other path
+        dist = (np.abs(block[:, None, 0] - array_2[None, :, 0]) +
+                np.abs(block[:, None, 1] - array_2[None, :, 1]))
+
+        # the first minimum, like the scalar loops
+        index = int(dist.argmin())
+
+        if min_dist == -1 or dist.flat[index] < min_dist:
+            min_dist = int(dist.flat[index])
+            row, column = divmod(index, len(array_2))
+            best_point_1 = start + row
+            best_point_2 = column
+
+    return (min_dist, tuple(int(i) for i in array_1[best_point_1]),
+            tuple(int(i) for i in array_2[best_point_2]))
+
+def dist_paths(path_1: list[tuple[int, int]], path_2: list[tuple[int, int]]
+               ) -> tuple[int, tuple[int, int], tuple[int, int]]:
+    """
+    This function calculates the shortest distance between 2 paths
+
+    Args:
+        path_1 (list[tuple[int, int]]): a path
+        path_2 (list[tuple[int, int]]): another path
+
+    Returns:
+        tuple[int, tuple[int, int], tuple[int, int]]: shortest Manhattan
+        distance and the closest points of both paths
+    """
+
+    return dist_arrays(to_array(path_1), to_array(path_2))
+
+class PathArray:
+    def __init__(self, points: Iterable[tuple[int, int]] = ()) -> None:
+        self.points: list[tuple[int, int]] = []  # unique points in order
+        self.seen: set[tuple[int, int]] = set()
+        self.array: Optional[np.ndarray] = None  # built when it is needed
+
+        self.extend(points)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def extend(self, points: Iterable[tuple[int, int]]) -> None:
+        """
+        This function adds multiple points to the path
+
+        Args:
+            points (Iterable[tuple[int, int]]): the points
+        """
+
+        for point in points:
+            # skip duplicates
+            if point not in self.seen:
+                self.seen.add(point)
+                self.points.append(point)
+                self.array = None
+
+    def dist(self, points: Iterable[tuple[int, int]], bound: int = -1
+             ) -> tuple[int, tuple[int, int], tuple[int, int]]:
+        """
+        This function calculates the shortest distance between points
+        and the path, all distances are calculated at once
+
+        Args:
+            points (Iterable[tuple[int, int]]): the points of a path
+            bound (int): only look for distances smaller than bound, -1
+                         for no bound
+
+        Returns:
+            tuple[int, tuple[int, int], tuple[int, int]]: shortest Manhattan
+            distance, the closest of the points and the closest point
+            of the path, distance -1 if nothing is closer than bound
+        """
+
+        points = to_array(list(points))
+
+        if len(points) == 0 or not self.points:
+            return -1, None, None
+
+        if self.array is None:
+            self.array = to_array(self.points)
+
+        min_dist, best_point_1, best_point_2 = dist_arrays(points, self.array)
+
+        # nothing is closer than the bound
+        if bound != -1 and min_dist >= bound:
+            return -1, None, None
+
+        return min_dist, best_point_1, best_point_2
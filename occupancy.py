@@ -0,0 +1,109 @@
+"""
+This python file contains a dense occupancy grid next to the mesa grid,
+the batteries, houses and cables of every cell are kept in NumPy arrays
+so a whole path can be checked at once
+"""
+
+from __future__ import annotations
+from typing import Iterable
+import numpy as np
+
+# value of a cell without a battery
+EMPTY = -1
+
+
+class OccupancyGrid:
+    def __init__(self, width: int, height: int,
+                 battery_ids: Iterable[int]) -> None:
+        self.width = width
+        self.height = height
+
+        # layer of the cable arrays of every battery id
+        self.layers = {battery_id: k for k, battery_id in enumerate(battery_ids)}
+
+        # battery id per cell, a flag for houses and the cables per battery
+        self.battery = np.full((width, height), EMPTY, dtype=np.int64)
+        self.house = np.zeros((width, height), dtype=bool)
+        self.cables = np.zeros((len(self.layers), width, height), dtype=bool)
+
+    @staticmethod
+    def coordinates(points: list[tuple[int, int]]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        This function splits points into their x and y coordinates
+
+        Args:
+            points (list[tuple[int, int]]): points on the grid
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the x and the y coordinates
+        """
+
+        array = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+
+        return array[:, 0], array[:, 1]
+
+    def place_battery(self, battery_id: int, x: int, y: int) -> None:
+        self.battery[x, y] = battery_id
+
+    def place_house(self, x: int, y: int) -> None:
+        self.house[x, y] = True
+
+    def place_cable(self, battery_id: int, x: int, y: int) -> None:
+        self.cables[self.layers[battery_id], x, y] = True
+
+    def place_cables(self, battery_id: int, points: list[tuple[int, int]]) -> None:
+        """
+        This function places the cables of a battery on all points at once
+
+        Args:
+            battery_id (int): id of the battery the cables go to
+            points (list[tuple[int, int]]): points of the cables
+        """
+
+        x, y = self.coordinates(points)
+        self.cables[self.layers[battery_id], x, y] = True
+
+    def has_cable(self, battery_id: int, x: int, y: int) -> bool:
+        return bool(self.cables[self.layers[battery_id], x, y])
+
+    def count_batteries(self, points: list[tuple[int, int]],
+                        battery_id: int) -> int:
+        """
+        This function counts the batteries on the points except one battery
+
+        Args:
+            points (list[tuple[int, int]]): points on the grid
+            battery_id (int): id of the battery which does not block
+
+        Returns:
+            int: number of other batteries on the points
+        """
+
+        x, y = self.coordinates(points)
+        found = self.battery[x, y]
+
+        return int(np.count_nonzero((found != EMPTY) & (found != battery_id)))
+
+    def first_cable(self, points: list[tuple[int, int]], battery_id: int) -> int:
+        """
+        This function finds the first point with a cable to a battery
+
+        Args:
+            points (list[tuple[int, int]]): points on the grid
+            battery_id (int): id of the battery
+
+        Returns:
+            int: index of the first point with a cable to the battery,
+            -1 if no point has one
+        """
+
+        if not points:
+            return -1
+
+        x, y = self.coordinates(points)
+        found = np.flatnonzero(self.cables[self.layers[battery_id], x, y])
+
+        if len(found) == 0:
+            return -1
+
+        return int(found[0])
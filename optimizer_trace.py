@@ -0,0 +1,106 @@
+"""
+This python file writes the trajectory of an optimizer to disk while it
+runs, one row per evaluated swap, as a csv or a jsonl file
+"""
+
+from __future__ import annotations
+from typing import Any, Optional
+import csv
+import json
+import os
+
+# fields of every row
+FIELDS = ('iteration', 'temperature', 'old_costs', 'new_costs', 'accepted',
+          'best_costs')
+
+# size of the write buffer in bytes
+BUFFER_SIZE = 1 << 16
+
+
+class TraceWriter:
+    def __init__(self, path: str, buffer_size: int = BUFFER_SIZE) -> None:
+        self.path = path
+        self.jsonl = path.endswith('.jsonl')  # csv for every other extension
+        self.rows = 0
+        self.file = open(path, 'w', newline='', buffering=buffer_size)
+
+        if not self.jsonl:
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(FIELDS)
+
+    def __enter__(self) -> TraceWriter:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def write(self, iteration: int, temperature: float, old_costs: int,
+              new_costs: int, accepted: bool, best_costs: int) -> None:
+        """
+        This function writes the row of one swap, rows are kept in the
+        buffer of the file until it is full
+
+        Args:
+            iteration (int): number of the iteration
+            temperature (float): acceptance probability or temperature
+            old_costs (int): costs before the swap
+            new_costs (int): costs after the swap
+            accepted (bool): if the swap is accepted
+            best_costs (int): best costs so far
+        """
+
+        row = (iteration, float(temperature), int(old_costs), int(new_costs),
+               bool(accepted), int(best_costs))
+
+        if self.jsonl:
+            self.file.write(json.dumps(dict(zip(FIELDS, row))) + '\n')
+        else:
+            self.writer.writerow(row)
+
+        self.rows += 1
+
+    def close(self) -> None:
+        """
+        This function writes what is left in the buffer and closes the file
+        """
+
+        if not self.file.closed:
+            self.file.close()
+
+
+def open_trace(path: Optional[str]) -> Optional[TraceWriter]:
+    """
+    This function opens a trace writer, when a path is given
+
+    Args:
+        path (Optional[str]): path of the csv or jsonl file, no trace if None
+
+    Returns:
+        Optional[TraceWriter]: the writer, None without a path
+    """
+
+    if path is None:
+        return None
+
+    return TraceWriter(path)
+
+
+def chain_path(path: Optional[str], chain: int) -> Optional[str]:
+    """
+    This function gives the trace path of one of the parallel chains, every
+    chain writes its own file
+
+    Args:
+        path (Optional[str]): path of the trace, no trace if None
+        chain (int): number of the chain
+
+    Returns:
+        Optional[str]: the path with the chain number before the extension
+    """
+
+    if path is None:
+        return None
+
+    root, extension = os.path.splitext(path)
+
+    return '{}-chain{}{}'.format(root, chain, extension)
@@ -0,0 +1,352 @@
+"""
+This python file runs simulated annealing chains and parallel tempering
+replicas in parallel processes, only compact selections (house indexes
+per battery in order of connection and in path order) are sent between
+them, so every process lays the cables of a selection in the same order
+"""
+
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from math import exp
+from typing import Any, Optional
+import random
+import time
+from simulated_annealing import anneal, metropolis
+from optimizer_trace import chain_path, open_trace
+from solution_state import SolutionState
+from route_cache import CACHE_SIZE, PATH_CACHE, PATH_CACHE_CELLS
+
+
+@lru_cache(maxsize=None)
+def district_state(district: int, router: str = 'greedy',
+                   engine: str = 'scalar',
+                   cache_size: int = CACHE_SIZE,
+                   path_cache_cells: int = PATH_CACHE_CELLS) -> SolutionState:
+    """
+    This function builds the solution state of a district, once per process,
+    routing and distance engine and cache sizes
+
+    Args:
+        district (int): district number
+        router (str): routing engine of the cables
+        engine (str): distance engine of the greedy router
+        cache_size (int): number of routed batteries the process remembers
+        path_cache_cells (int): number of path cells the process remembers
+
+    Returns:
+        SolutionState: the state of a smartgrid without optimization,
+        set_selection resets it for every use
+    """
+
+    # imported here, smartgrid2 imports this module
+    from smartgrid2 import SmartGrid
+
+    model = SmartGrid(district, iteration=0, router=router, engine=engine,
+                      cache_size=cache_size, path_cache_cells=path_cache_cells)
+
+    return SolutionState.from_model(model)
+
+
+def apply_selection(smartgrid, state: SolutionState,
+                    selection: tuple[list[list[int]], list[list[int]]]) -> None:
+    """
+    This function makes the smartgrid a selection and lays its cables in
+    the path order of the selection
+
+    Args:
+        smartgrid (Smartgrid): a smartgrid
+        state (SolutionState): the state of the smartgrid
+        selection (tuple[list[list[int]], list[list[int]]]): house indexes
+            per battery in order of connection and in path order
+    """
+
+    state.set_selection(selection)
+    state.apply(smartgrid)
+    smartgrid.lay_cables(smartgrid.batteries)
+
+
+def run_chain(district: int, selection: tuple[list[list[int]], list[list[int]]],
+              seed: int,
+              iteration: Optional[int], time_budget: Optional[float] = None,
+              patience: Optional[int] = None,
+              trace: Optional[str] = None,
+              router: str = 'greedy', engine: str = 'scalar',
+              cache_size: int = CACHE_SIZE,
+              path_cache_cells: int = PATH_CACHE_CELLS) -> dict[str, Any]:
+    """
+    This function runs one annealing chain in a worker process
+
+    Args:
+        district (int): district number
+        selection (tuple[list[list[int]], list[list[int]]]): house indexes
+            per battery to start from, in order of connection and path order
+        seed (int): seed of the chain
+        iteration (Optional[int]): number of iterations, no limit if None
+        time_budget (Optional[float]): seconds to optimize, no limit if None
+        patience (Optional[int]): stop after this number of iterations
+                                  without a better selection, no limit if None
+        trace (Optional[str]): path of the trace of the chain, no trace if None
+        router (str): routing engine of the cables
+        engine (str): distance engine of the greedy router
+        cache_size (int): number of routed batteries the process remembers
+        path_cache_cells (int): number of path cells the process remembers
+
+    Returns:
+        dict[str, Any]: statistics and best selection of the chain
+    """
+
+    start = time.perf_counter()
+    random.seed(seed)
+
+    state = district_state(district, router, engine, cache_size,
+                           path_cache_cells)
+    state.set_selection(selection)
+    writer = open_trace(trace)
+    try:
+        stats = anneal(state, iteration, time_budget, patience, writer)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    # the best selection in its own order, so the parent lays the same cables
+    stats['selection'] = state.get_selection()
+    stats['seed'] = seed
+    stats['time'] = time.perf_counter() - start
+    stats['cache'] = state.cache.info()
+    stats['path_cache'] = PATH_CACHE.info()
+
+    return stats
+
+
+def multi_chain_optimization(smartgrid, iteration: Optional[int], chains: int = 4,
+                             seed: Optional[int] = None,
+                             workers: Optional[int] = None,
+                             time_budget: Optional[float] = None,
+                             patience: Optional[int] = None,
+                             trace: Optional[str] = None) -> list[dict[str, Any]]:
+    """
+    This function runs independently seeded annealing chains from the
+    current selection and makes the smartgrid the best result
+
+    Args:
+        smartgrid (Smartgrid): a smartgrid
+        iteration (Optional[int]): number of iterations per chain, no limit
+                                   if None
+        chains (int): number of chains
+        seed (Optional[int]): seed for the seeds of the chains
+        workers (Optional[int]): number of processes, one per cpu if None
+        time_budget (Optional[float]): seconds every chain anneals, no limit
+                                       if None
+        patience (Optional[int]): stop a chain after this number of
+                                  iterations without a better selection
+        trace (Optional[str]): path of the traces, every chain writes its
+                               own file with the chain number, no trace if None
+
+    Returns:
+        list[dict[str, Any]]: statistics of every chain
+    """
+
+    state = SolutionState.from_model(smartgrid)
+    selection = state.get_selection()
+    seeds = random.Random(seed).sample(range(2 ** 31), chains)
+
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(run_chain, smartgrid.district, selection,
+                                   chain_seed, iteration, time_budget, patience,
+                                   chain_path(trace, chain), smartgrid.router,
+                                   smartgrid.engine, smartgrid.cache_size,
+                                   smartgrid.path_cache_cells)
+                   for chain, chain_seed in enumerate(seeds)]
+        results = [future.result() for future in futures]
+
+    # make the smartgrid the best chain
+    best = min(results, key=lambda x: x['costs'])
+    apply_selection(smartgrid, state, best['selection'])
+
+    return results
+
+
+def run_replica(district: int, selection: tuple[list[list[int]], list[list[int]]],
+                temperature: float,
+                iteration: int, seed: int, router: str = 'greedy',
+                engine: str = 'scalar',
+                cache_size: int = CACHE_SIZE,
+                path_cache_cells: int = PATH_CACHE_CELLS) -> dict[str, Any]:
+    """
+    This function runs one replica at a fixed temperature in a worker process
+
+    Args:
+        district (int): district number
+        selection (tuple[list[list[int]], list[list[int]]]): house indexes
+            per battery to start from, in order of connection and path order
+        temperature (float): temperature of the replica
+        iteration (int): number of iterations
+        seed (int): seed of the replica
+        router (str): routing engine of the cables
+        engine (str): distance engine of the greedy router
+        cache_size (int): number of routed batteries the process remembers
+        path_cache_cells (int): number of path cells the process remembers
+
+    Returns:
+        dict[str, Any]: statistics, last and best selection of the replica
+    """
+
+    random.seed(seed)
+
+    state = district_state(district, router, engine, cache_size,
+                           path_cache_cells)
+    state.set_selection(selection)
+    stats = metropolis(state, iteration, temperature)
+    stats['selection'] = state.get_selection()
+
+    return stats
+
+
+def temperature_ladder(min_temperature: float, max_temperature: float,
+                       replicas: int) -> list[float]:
+    """
+    This function gives a geometric ladder of temperatures, every
+    temperature is the same factor hotter than the one before
+
+    Args:
+        min_temperature (float): temperature of the coldest replica
+        max_temperature (float): temperature of the hottest replica
+        replicas (int): number of replicas, at least 2
+
+    Returns:
+        list[float]: the temperatures from cold to hot
+    """
+
+    ratio = max_temperature / min_temperature
+
+    return [min_temperature * ratio ** (k / (replicas - 1))
+            for k in range(replicas)]
+
+
+def accept_exchange(costs_1: int, costs_2: int, temperature_1: float,
+                    temperature_2: float, rng: random.Random) -> bool:
+    """
+    This function decides with the Metropolis criterion if two replicas
+    exchange their selections, the colder replica always takes the
+    cheaper selection
+
+    Args:
+        costs_1 (int): costs of the selection of the first replica
+        costs_2 (int): costs of the selection of the second replica
+        temperature_1 (float): temperature of the first replica
+        temperature_2 (float): temperature of the second replica
+        rng (random.Random): random numbers of the exchanges
+
+    Returns:
+        bool: if the replicas exchange their selections
+    """
+
+    delta = (costs_1 - costs_2) * (1 / temperature_1 - 1 / temperature_2)
+
+    return delta >= 0 or rng.random() < exp(delta)
+
+
+def replica_exchange_optimization(smartgrid, iteration: Optional[int],
+                                  replicas: int = 4,
+                                  min_temperature: float = 5.0,
+                                  max_temperature: float = 200.0,
+                                  sweep: int = 50, seed: Optional[int] = None,
+                                  workers: Optional[int] = None,
+                                  time_budget: Optional[float] = None) -> dict[str, Any]:
+    """
+    This function runs replicas at a geometric ladder of temperatures in
+    parallel, after every sweep neighbouring replicas exchange their
+    selection with the Metropolis criterion, the smartgrid becomes the
+    best selection of all replicas
+
+    Args:
+        smartgrid (Smartgrid): a smartgrid
+        iteration (Optional[int]): number of iterations per replica, no
+                                   limit if None
+        replicas (int): number of replicas, at least 2
+        min_temperature (float): temperature of the coldest replica
+        max_temperature (float): temperature of the hottest replica
+        sweep (int): number of iterations between exchanges, the last
+                     sweep runs the iterations which are left
+        seed (Optional[int]): seed for the seeds of the replicas
+        workers (Optional[int]): number of processes, one per cpu if None
+        time_budget (Optional[float]): seconds after which no new sweep is
+                                       started, no limit if None
+
+    Returns:
+        dict[str, Any]: temperatures, best costs, exchange statistics per
+        neighbouring pair, swap statistics per temperature and the number
+        of sweeps
+    """
+
+    if iteration is None and time_budget is None:
+        raise ValueError('replica exchange needs iterations or a time budget')
+
+    rng = random.Random(seed)
+    temperatures = temperature_ladder(min_temperature, max_temperature, replicas)
+
+    # all replicas start from the current selection
+    state = SolutionState.from_model(smartgrid)
+    selection = state.get_selection()
+    costs = state.costs()
+    states = [selection] * replicas
+    energies = [costs] * replicas
+
+    stats = {'temperatures': temperatures, 'initial': costs, 'costs': costs,
+             'exchanges': [0] * (replicas - 1),
+             'accepted_exchanges': [0] * (replicas - 1),
+             'accepted': [0] * replicas, 'rejected': [0] * replicas,
+             'skipped': [0] * replicas}
+    best_selection = selection
+
+    # iterations every replica still has to run, the last sweep is shorter
+    remaining = iteration
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    i = 0
+
+    with ProcessPoolExecutor(workers) as executor:
+        while remaining is None or remaining > 0:
+            # no new sweep when out of time
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+            length = sweep if remaining is None else min(sweep, remaining)
+            futures = [executor.submit(run_replica, smartgrid.district, states[k],
+                                       temperatures[k], length, rng.randrange(2 ** 31),
+                                       smartgrid.router, smartgrid.engine,
+                                       smartgrid.cache_size,
+                                       smartgrid.path_cache_cells)
+                       for k in range(replicas)]
+
+            for k, future in enumerate(futures):
+                result = future.result()
+                states[k], energies[k] = result['selection'], result['costs']
+
+                for key in ('accepted', 'rejected', 'skipped'):
+                    stats[key][k] += result[key]
+
+                if result['best_costs'] < stats['costs']:
+                    stats['costs'] = result['best_costs']
+                    best_selection = result['best_selection']
+
+            # exchange even and odd neighbouring pairs in turns
+            for k in range(i % 2, replicas - 1, 2):
+                stats['exchanges'][k] += 1
+
+                if accept_exchange(energies[k], energies[k + 1], temperatures[k],
+                                   temperatures[k + 1], rng):
+                    states[k], states[k + 1] = states[k + 1], states[k]
+                    energies[k], energies[k + 1] = energies[k + 1], energies[k]
+                    stats['accepted_exchanges'][k] += 1
+
+            if remaining is not None:
+                remaining -= length
+            i += 1
+
+    stats['sweeps'] = i
+
+    # make the smartgrid the best selection
+    apply_selection(smartgrid, state, best_selection)
+
+    return stats
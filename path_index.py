@@ -0,0 +1,259 @@
+"""
+This python file contains a grid bucketed spatial index for the points
+of a cable path, used for nearest point queries between paths
+"""
+
+from __future__ import annotations
+from typing import Iterable
+
+# indexes with at most this number of points are searched point by point
+SCAN_LIMIT = 48
+
+
+class PathIndex:
+    def __init__(self, points: Iterable[tuple[int, int]] = (),
+                 size: int = 4) -> None:
+        self.size = size  # width and height of a bucket
+        self.buckets: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        self.points: list[tuple[int, int]] = []  # unique points in order
+        self.seen: set[tuple[int, int]] = set()
+
+        # smallest and biggest bucket coordinates
+        self.min_x, self.min_y = 0, 0
+        self.max_x, self.max_y = -1, -1
+
+        # box around all points
+        self.box = (0, 0, -1, -1)
+
+        self.extend(points)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def add(self, point: tuple[int, int]) -> None:
+        """
+        This function adds a point to the index
+
+        Args:
+            point (tuple[int, int]): a point
+        """
+
+        # skip duplicates
+        if point in self.seen:
+            return
+
+        self.seen.add(point)
+        self.points.append(point)
+
+        # place the point in its bucket
+        bucket = (point[0] // self.size, point[1] // self.size)
+        self.buckets.setdefault(bucket, []).append(point)
+
+        # update the bucket boundaries and the box
+        if len(self.points) == 1:
+            self.min_x, self.min_y = bucket
+            self.max_x, self.max_y = bucket
+            self.box = (point[0], point[1], point[0], point[1])
+            return
+
+        self.min_x, self.max_x = min(self.min_x, bucket[0]), max(self.max_x, bucket[0])
+        self.min_y, self.max_y = min(self.min_y, bucket[1]), max(self.max_y, bucket[1])
+        self.box = (min(self.box[0], point[0]), min(self.box[1], point[1]),
+                    max(self.box[2], point[0]), max(self.box[3], point[1]))
+
+    def extend(self, points: Iterable[tuple[int, int]]) -> None:
+        """
+        This function adds multiple points to the index
+
+        Args:
+            points (Iterable[tuple[int, int]]): the points
+        """
+
+        for point in points:
+            self.add(point)
+
+    def nearest(self, point: tuple[int, int],
+                bound: int = -1) -> tuple[int, tuple[int, int]]:
+        """
+        This function finds the closest point of the index to a point by
+        searching rings of buckets around the point
+
+        Args:
+            point (tuple[int, int]): a point
+            bound (int): only look for points closer than bound, -1 for
+                         no bound
+
+        Returns:
+            tuple[int, tuple[int, int]]: the Manhattan distance and the
+            closest point, distance -1 if no point is closer than bound
+        """
+
+        x, y = point
+        bucket_x, bucket_y = x // self.size, y // self.size
+
+        # the bound is the distance to beat
+        min_dist = bound
+        best_point = None
+
+        # scanning is faster than searching buckets for small indexes
+        if len(self.points) <= SCAN_LIMIT:
+            candidates = self.points
+        else:
+            candidates = []
+
+            # rings before the first bucket with points are empty
+            first_ring = max(0, self.min_x - bucket_x, bucket_x - self.max_x,
+                             self.min_y - bucket_y, bucket_y - self.max_y)
+            last_ring = max(bucket_x - self.min_x, self.max_x - bucket_x,
+                            bucket_y - self.min_y, self.max_y - bucket_y)
+
+            for ring in range(first_ring, last_ring + 1):
+                # points of this ring are at least this far away
+                ring_dist = (ring - 1) * self.size + 1
+
+                if ring > 0 and min_dist != -1 and min_dist <= ring_dist:
+                    break
+
+                # rings with more buckets than the index are not searched
+                if 8 * ring > len(self.buckets):
+                    candidates = self.remaining(x, y, ring, min_dist)
+                    break
+
+                for bucket in self.ring(bucket_x, bucket_y, ring):
+                    for other in self.buckets.get(bucket, ()):
+                        dist = abs(x - other[0]) + abs(y - other[1])
+
+                        if min_dist == -1 or dist < min_dist:
+                            min_dist = dist
+                            best_point = other
+
+        for other in candidates:
+            dist = abs(x - other[0]) + abs(y - other[1])
+
+            if min_dist == -1 or dist < min_dist:
+                min_dist = dist
+                best_point = other
+
+        # nothing is closer than the bound
+        if best_point is None:
+            return -1, point
+
+        return min_dist, best_point
+
+    def remaining(self, x: int, y: int, ring: int,
+                  bound: int) -> list[tuple[int, int]]:
+        """
+        This function gives the points of all buckets from a ring onwards
+        which can be closer to a point than the bound
+
+        Args:
+            x (int): x coordinate of the point
+            y (int): y coordinate of the point
+            ring (int): the first ring
+            bound (int): distance to beat, -1 for no bound
+
+        Returns:
+            list[tuple[int, int]]: the points which can be closer
+        """
+
+        bucket_x, bucket_y = x // self.size, y // self.size
+        candidates = []
+
+        for (i, j), points in self.buckets.items():
+            # skip the buckets of the searched rings
+            if max(abs(i - bucket_x), abs(j - bucket_y)) < ring:
+                continue
+
+            # the distance to the bucket is the smallest possible distance
+            dist = (max(i * self.size - x, 0, x - (i + 1) * self.size + 1) +
+                    max(j * self.size - y, 0, y - (j + 1) * self.size + 1))
+
+            if bound == -1 or dist < bound:
+                candidates += points
+
+        return candidates
+
+    def ring(self, bucket_x: int, bucket_y: int,
+             ring: int) -> list[tuple[int, int]]:
+        """
+        This function gives the buckets on the square ring around a bucket
+
+        Args:
+            bucket_x (int): x coordinate of the centre bucket
+            bucket_y (int): y coordinate of the centre bucket
+            ring (int): distance of the ring in buckets
+
+        Returns:
+            list[tuple[int, int]]: the buckets of the ring
+        """
+
+        if ring == 0:
+            return [(bucket_x, bucket_y)]
+
+        # top and bottom row
+        buckets = [(i, j) for i in range(bucket_x - ring, bucket_x + ring + 1)
+                   for j in (bucket_y - ring, bucket_y + ring)]
+
+        # left and right column without the corners
+        buckets += [(i, j) for j in range(bucket_y - ring + 1, bucket_y + ring)
+                    for i in (bucket_x - ring, bucket_x + ring)]
+
+        return buckets
+
+    def dist(self, points: Iterable[tuple[int, int]], bound: int = -1
+             ) -> tuple[int, tuple[int, int], tuple[int, int]]:
+        """
+        This function calculates the shortest distance between points
+        and the index
+
+        Args:
+            points (Iterable[tuple[int, int]]): the points of a path
+            bound (int): only look for distances smaller than bound, -1
+                         for no bound
+
+        Returns:
+            tuple[int, tuple[int, int], tuple[int, int]]: shortest Manhattan
+            distance, the closest of the points and the closest point
+            of the index, distance -1 if nothing is closer than bound
+        """
+
+        min_dist = bound
+        best_point_1, best_point_2 = None, None
+        min_x, min_y, max_x, max_y = self.box
+        small = len(self.points) <= SCAN_LIMIT
+
+        for point in points:
+            x, y = point
+
+            # the distance to the box is the smallest possible distance
+            if min_dist != -1 and (max(min_x - x, 0, x - max_x) +
+                                   max(min_y - y, 0, y - max_y)) >= min_dist:
+                continue
+
+            # scan small indexes point by point
+            if small:
+                for other in self.points:
+                    dist = abs(x - other[0]) + abs(y - other[1])
+
+                    if min_dist == -1 or dist < min_dist:
+                        min_dist = dist
+                        best_point_1 = point
+                        best_point_2 = other
+            else:
+                dist, other = self.nearest(point, min_dist)
+
+                # a distance is only found if it is smaller than the minimum
+                if dist != -1:
+                    min_dist = dist
+                    best_point_1 = point
+                    best_point_2 = other
+
+            # it does not get closer than touching
+            if min_dist == 0:
+                break
+
+        # nothing is closer than the bound
+        if best_point_1 is None:
+            return -1, None, None
+
+        return min_dist, best_point_1, best_point_2
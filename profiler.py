@@ -0,0 +1,121 @@
+"""
+This python file contains the instrumentation of the smartgrid, named
+timing spans and counters which can be switched on and off and exported
+as json or as a flat csv file
+"""
+
+from __future__ import annotations
+from contextlib import nullcontext
+from typing import Any
+import csv
+import json
+import time
+
+# context of a switched off profiler, reused for every span
+NO_SPAN = nullcontext()
+
+
+class Span:
+    def __init__(self, profiler: Profiler, name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> Span:
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        span = self.profiler.spans.setdefault(self.name, [0, 0.0])
+        span[0] += 1
+        span[1] += time.perf_counter() - self.start
+
+
+class Profiler:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.spans: dict[str, list] = {}  # number of calls and total time
+        self.counters: dict[str, int] = {}
+
+    def span(self, name: str) -> Any:
+        """
+        This function times a block of code under a name
+
+        Args:
+            name (str): name of the span
+
+        Returns:
+            Any: context manager, it does nothing when switched off
+        """
+
+        if not self.enabled:
+            return NO_SPAN
+
+        return Span(self, name)
+
+    def count(self, name: str, number: int = 1) -> None:
+        """
+        This function increases a counter
+
+        Args:
+            name (str): name of the counter
+            number (int): increase of the counter
+        """
+
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + number
+
+    def reset(self) -> None:
+        """
+        This function removes all spans and counters
+        """
+
+        self.spans = {}
+        self.counters = {}
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        This function gives all spans and counters
+
+        Returns:
+            dict[str, Any]: calls and total seconds of every span and the
+            value of every counter
+        """
+
+        return {'spans': {name: {'calls': calls, 'seconds': seconds}
+                          for name, (calls, seconds) in self.spans.items()},
+                'counters': dict(self.counters)}
+
+    def to_json(self, path: str) -> None:
+        """
+        This function writes all spans and counters to a json file
+
+        Args:
+            path (str): path of the json file
+        """
+
+        with open(path, 'w') as outfile:
+            json.dump(self.to_dict(), outfile, indent=2)
+
+    def to_csv(self, path: str) -> None:
+        """
+        This function writes all spans and counters to a flat csv file,
+        one row per span or counter
+
+        Args:
+            path (str): path of the csv file
+        """
+
+        with open(path, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['kind', 'name', 'calls', 'seconds', 'value'])
+
+            for name, (calls, seconds) in self.spans.items():
+                writer.writerow(['span', name, calls, seconds, ''])
+
+            for name, value in self.counters.items():
+                writer.writerow(['counter', name, '', '', value])
+
+
+# profiler of this process, switched off until a smartgrid switches it on
+PROFILER = Profiler()
@@ -0,0 +1,253 @@
+"""
+This python file places the houses which did not fit in any battery with
+ejection chains: the house goes to a battery, a house of that battery goes
+to another battery and so on, until a battery has room. The chains are
+found with a beam search that is bounded in depth and width, so a chain
+that exists can be missed, then room is gathered in one battery by greedy
+moves and swaps. A house that neither places stays not placed
+"""
+
+from __future__ import annotations
+from typing import Optional
+import numpy as np
+
+# maximum number of houses moved for one placed house
+DEPTH = 8
+
+# number of cheapest and of smallest ejections followed from every house
+WIDTH = 16
+
+# maximum number of moves to gather room in a battery
+STEPS = 50
+
+
+def find_chain(house: int, dist: np.ndarray, energy: np.ndarray,
+               remaining: np.ndarray, assignment: np.ndarray,
+               depth: int = DEPTH, width: int = WIDTH
+               ) -> Optional[tuple[tuple[int, int], ...]]:
+    """
+    This function searches a chain of moves that places a house with a
+    beam search on the distances: every level follows only the cheapest and
+    the smallest ejections of every house and the 4 * width cheapest chains,
+    up to depth moves. It gives the cheapest chain it finds, which is not
+    always the cheapest chain, and misses chains outside the beam. A battery
+    can be passed more than once as long as it never has less than no
+    capacity left
+
+    Args:
+        house (int): index of a not placed house
+        dist (np.ndarray): (houses, batteries) distances
+        energy (np.ndarray): (houses,) energy of the houses
+        remaining (np.ndarray): (batteries,) remaining capacity
+        assignment (np.ndarray): (houses,) battery per house, -1 if not placed
+        depth (int): maximum number of moves
+        width (int): number of cheapest and of smallest ejections followed
+                     per house
+
+    Returns:
+        Optional[tuple[tuple[int, int], ...]]: the moves as house and new
+        battery, None if no chain places the house
+    """
+
+    placed = assignment != -1
+    battery = np.where(placed, assignment, 0)
+
+    # what moving every placed house out of its battery saves
+    saving = np.where(placed, dist[np.arange(len(energy)), battery], 0)
+
+    # cheapest known chain which ends with a house that has to move, with
+    # the remaining capacity after the moves of the chain
+    labels = {house: (0.0, (), remaining)}
+    frontier = [house]
+    best_cost, best_chain = np.inf, None
+
+    for level in range(depth):
+        new_frontier = []
+
+        for moving in frontier:
+            cost, chain, left = labels[moving]
+            moved = [move[0] for move in chain] + [moving]
+
+            # the chain ends in the closest battery with room
+            fits = left - energy[moving] >= 0
+            if fits.any():
+                target = int(np.where(fits, dist[moving], np.inf).argmin())
+                if cost + dist[moving, target] < best_cost:
+                    best_cost = cost + dist[moving, target]
+                    best_chain = chain + ((moving, target),)
+
+            if level == depth - 1:
+                continue
+
+            # or a house leaves a battery to make room for the moving house
+            room = placed & (left[battery] + energy - energy[moving] >= 0)
+            room[moved] = False
+            candidates = np.flatnonzero(room)
+            delta = cost + dist[moving, battery[candidates]] - saving[candidates]
+
+            # follow the cheapest ejections and the smallest houses, which
+            # are the easiest to place
+            if len(candidates) > 2 * width:
+                keep = np.union1d(np.argpartition(delta, width)[:width],
+                                  np.argpartition(energy[candidates], width)[:width])
+                candidates, delta = candidates[keep], delta[keep]
+
+            for other, other_cost in zip(candidates.tolist(), delta.tolist()):
+                if other_cost < labels.get(other, (np.inf,))[0]:
+                    target = int(battery[other])
+                    other_left = left.copy()
+                    other_left[target] += energy[other] - energy[moving]
+                    labels[other] = (other_cost, chain + ((moving, target),), other_left)
+                    new_frontier.append(other)
+
+        # only the cheapest chains are followed further
+        frontier = sorted(set(new_frontier), key=lambda x: labels[x][0])[:4 * width]
+
+    return best_chain
+
+
+def make_room(house: int, dist: np.ndarray, energy: np.ndarray,
+              remaining: np.ndarray, assignment: np.ndarray,
+              steps: int = STEPS) -> Optional[list[tuple[int, int]]]:
+    """
+    This function gathers the spare capacity in one battery until a house
+    fits in it, every step moves a house out of that battery or swaps it
+    for a smaller house of another battery, the biggest gain first
+
+    Args:
+        house (int): index of a not placed house
+        dist (np.ndarray): (houses, batteries) distances
+        energy (np.ndarray): (houses,) energy of the houses
+        remaining (np.ndarray): (batteries,) remaining capacity
+        assignment (np.ndarray): (houses,) battery per house, -1 if not placed
+        steps (int): maximum number of moves and swaps
+
+    Returns:
+        Optional[list[tuple[int, int]]]: the moves as house and new battery,
+        None if no battery gets enough room
+    """
+
+    # the batteries with the most spare capacity are tried first
+    for target in np.argsort(-remaining, kind='stable').tolist():
+        left, placed = remaining.copy(), assignment.copy()
+        moves = []
+
+        for step in range(steps):
+            if left[target] - energy[house] >= 0:
+                break
+
+            inside = np.flatnonzero(placed == target)
+            outside = np.flatnonzero((placed != target) & (placed != -1))
+            battery = placed[outside]
+
+            # gain of swapping a house inside for a house outside, a move
+            # of a house inside to a battery of a house outside is a swap
+            # with nothing
+            gain = energy[inside][:, None] - energy[outside][None, :]
+            move = energy[inside][:, None] <= left[battery][None, :]
+            gain = np.where(move, energy[inside][:, None],
+                            np.where((gain > 0) & (gain <= left[battery][None, :]), gain, 0))
+
+            if not gain.any():
+                break
+
+            i, j = np.unravel_index(gain.argmax(), gain.shape)
+            inner, outer = int(inside[i]), int(outside[j])
+            moves.append((inner, int(battery[j])))
+            left[battery[j]] -= energy[inner]
+            left[target] += energy[inner]
+            placed[inner] = battery[j]
+
+            # the house outside only moves in when it is a swap
+            if not move[i, j]:
+                moves.append((outer, target))
+                left[battery[j]] += energy[outer]
+                left[target] -= energy[outer]
+                placed[outer] = target
+
+        if left[target] - energy[house] >= 0:
+            return moves + [(house, target)]
+
+    return None
+
+
+def repair_assignment(dist: np.ndarray, energy: np.ndarray,
+                      remaining: np.ndarray, assignment: np.ndarray,
+                      depth: int = DEPTH, width: int = WIDTH) -> list[int]:
+    """
+    This function places all not placed houses, the biggest first, the
+    assignment and remaining capacity are changed in place
+
+    Args:
+        dist (np.ndarray): (houses, batteries) distances
+        energy (np.ndarray): (houses,) energy of the houses
+        remaining (np.ndarray): (batteries,) remaining capacity
+        assignment (np.ndarray): (houses,) battery per house, -1 if not placed
+        depth (int): maximum number of moves per placed house
+        width (int): number of cheapest and of smallest ejections followed
+                     per house
+
+    Returns:
+        list[int]: indexes of the houses which could not be placed
+    """
+
+    not_placed = []
+    unplaced = np.flatnonzero(assignment == -1)
+
+    for house in unplaced[np.argsort(-energy[unplaced], kind='stable')].tolist():
+        chain = find_chain(house, dist, energy, remaining, assignment, depth, width)
+
+        # gather spare capacity when no chain is found
+        if chain is None:
+            chain = make_room(house, dist, energy, remaining, assignment)
+
+        if chain is None:
+            not_placed.append(house)
+            continue
+
+        for moving, battery in chain:
+            if assignment[moving] != -1:
+                remaining[assignment[moving]] += energy[moving]
+            remaining[battery] -= energy[moving]
+            assignment[moving] = battery
+
+    return not_placed
+
+
+def repair(batteries: list, houses: list, dist: np.ndarray) -> list:
+    """
+    This function connects the not placed houses of a smartgrid, other
+    houses change battery when that makes room
+
+    Args:
+        batteries (list[Battery]): all batteries
+        houses (list[House]): all houses
+        dist (np.ndarray): (houses, batteries) distances, a house is row
+                           unique_id - 1 and a battery column unique_id - 1
+
+    Returns:
+        list[House]: the houses which could not be placed, they stay without
+        battery. This happens when the spare capacity is spread over the
+        batteries so that no battery has room for the house, even after
+        moving DEPTH houses or gathering room with STEPS moves
+    """
+
+    houses = sorted(houses, key=lambda x: x.unique_id)
+    batteries = sorted(batteries, key=lambda x: x.unique_id)
+    column = {id(battery): i for i, battery in enumerate(batteries)}
+
+    energy = np.array([house.energy for house in houses])
+    remaining = np.array([battery.energy for battery in batteries])
+    assignment = np.array([-1 if house.connection is None else column[id(house.connection)]
+                           for house in houses], dtype=np.int64)
+    old = assignment.copy()
+
+    not_placed = repair_assignment(dist, energy, remaining, assignment)
+
+    # move the houses of the chains to their new battery
+    for i in np.flatnonzero(assignment != old).tolist():
+        if houses[i].connection is not None:
+            houses[i].connection.remove_house(houses[i])
+        batteries[assignment[i]].add_house(houses[i])
+
+    return [houses[i] for i in not_placed]
@@ -0,0 +1,238 @@
+"""
+This python file contains a bounded cache for the routed cables of a
+battery, the same houses of a battery come back often while optimizing,
+and a cache for the L-shaped paths between 2 points which is bounded by
+the number of cells it keeps
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Optional
+
+# default number of routed batteries that are remembered
+CACHE_SIZE = 4096
+
+# default number of cells of L-shaped paths that are remembered, a cell
+# of a path is a reference of 8 bytes to the one tuple of that cell
+PATH_CACHE_CELLS = 1 << 20
+
+
+class RouteCache:
+    def __init__(self, maxsize: int = CACHE_SIZE) -> None:
+        self.maxsize = maxsize  # number of remembered batteries, 0 disables
+        self.routes: OrderedDict[tuple, list[tuple[int, int]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    @staticmethod
+    def key(all_paths: list[list[tuple[int, int]]], router: str = 'greedy',
+            engine: str = 'scalar') -> tuple:
+        """
+        This function creates the key of the unmerged paths of a battery,
+        the order of the paths is kept because it decides the routing
+
+        Args:
+            all_paths (list[list[tuple[int, int]]]): the paths, the first is
+                                                     the battery
+            router (str): routing engine that lays the cables
+            engine (str): distance engine of the router
+
+        Returns:
+            tuple: the routing and distance engine and the points of every
+            path in order
+        """
+
+        return (router, engine) + tuple(tuple(path) for path in all_paths)
+
+    def get(self, key: tuple) -> Optional[list[tuple[int, int]]]:
+        """
+        This function looks up the cable cells of a routed battery
+
+        Args:
+            key (tuple): key of the paths of the battery
+
+        Returns:
+            Optional[list[tuple[int, int]]]: the unique cable cells, None if
+            the battery is not remembered, the list may not be changed
+        """
+
+        cells = self.routes.get(key)
+
+        if cells is None:
+            self.misses += 1
+            return None
+
+        # the battery is now the most recently used
+        self.routes.move_to_end(key)
+        self.hits += 1
+
+        return cells
+
+    def put(self, key: tuple, cells: list[tuple[int, int]]) -> None:
+        """
+        This function remembers the cable cells of a routed battery, the
+        least recently used battery is forgotten when the cache is full
+
+        Args:
+            key (tuple): key of the paths of the battery
+            cells (list[tuple[int, int]]): the unique cable cells
+        """
+
+        if self.maxsize <= 0:
+            return
+
+        self.routes[key] = cells
+        self.routes.move_to_end(key)
+
+        while len(self.routes) > self.maxsize:
+            self.routes.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        """
+        This function changes the number of remembered batteries
+
+        Args:
+            maxsize (int): number of remembered batteries, 0 disables
+        """
+
+        self.maxsize = maxsize
+
+        while len(self.routes) > max(maxsize, 0):
+            self.routes.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        This function forgets all batteries and resets the counters
+        """
+
+        self.routes.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> dict[str, Any]:
+        """
+        This function gives the statistics of the cache
+
+        Returns:
+            dict[str, Any]: hits, misses, hit rate, size and maximum size
+        """
+
+        lookups = self.hits + self.misses
+
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self.routes), 'maxsize': self.maxsize}
+
+
+class PathCache:
+    def __init__(self, maxcells: int = PATH_CACHE_CELLS) -> None:
+        self.maxcells = maxcells  # number of remembered cells, 0 disables
+        self.paths: OrderedDict[tuple, tuple[tuple[int, int], ...]] = OrderedDict()
+        # every cell of the remembered paths once, at most the cells of the grid
+        self.cells: dict[tuple[int, int], tuple[int, int]] = {}
+        self.num_cells = 0  # cells of all remembered paths
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def get(self, key: tuple) -> Optional[tuple[tuple[int, int], ...]]:
+        """
+        This function looks up a path
+
+        Args:
+            key (tuple): the points and the shape of the path
+
+        Returns:
+            Optional[tuple[tuple[int, int], ...]]: the cells of the path, None
+            if the path is not remembered
+        """
+
+        path = self.paths.get(key)
+
+        if path is None:
+            self.misses += 1
+            return None
+
+        # the path is now the most recently used
+        self.paths.move_to_end(key)
+        self.hits += 1
+
+        return path
+
+    def put(self, key: tuple, path: list[tuple[int, int]]
+            ) -> tuple[tuple[int, int], ...]:
+        """
+        This function remembers a path, all paths share the tuple of a cell
+        so a path only keeps references. The least recently used paths are
+        forgotten when there are too many cells
+
+        Args:
+            key (tuple): the points and the shape of the path
+            path (list[tuple[int, int]]): the cells of the path
+
+        Returns:
+            tuple[tuple[int, int], ...]: the remembered path
+        """
+
+        if len(path) > self.maxcells or key in self.paths:
+            return tuple(path)
+
+        path = tuple(self.cells.setdefault(cell, cell) for cell in path)
+
+        self.paths[key] = path
+        self.num_cells += len(path)
+
+        while self.num_cells > self.maxcells:
+            self.num_cells -= len(self.paths.popitem(last=False)[1])
+
+        return path
+
+    def resize(self, maxcells: int) -> None:
+        """
+        This function changes the number of remembered cells
+
+        Args:
+            maxcells (int): number of remembered cells, 0 disables
+        """
+
+        self.maxcells = maxcells
+
+        while self.num_cells > max(maxcells, 0):
+            self.num_cells -= len(self.paths.popitem(last=False)[1])
+
+    def clear(self) -> None:
+        """
+        This function forgets all paths and cells and resets the counters
+        """
+
+        self.paths.clear()
+        self.cells.clear()
+        self.num_cells = 0
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> dict[str, Any]:
+        """
+        This function gives the statistics of the cache
+
+        Returns:
+            dict[str, Any]: hits, misses, hit rate, number of paths, number
+            of cells and maximum number of cells
+        """
+
+        lookups = self.hits + self.misses
+
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self.paths), 'cells': self.num_cells,
+                'maxcells': self.maxcells}
+
+
+# caches shared by lay_cables and the optimizers of this process
+ROUTE_CACHE = RouteCache()
+PATH_CACHE = PathCache()
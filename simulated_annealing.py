@@ -4,26 +4,58 @@ This python file does simulated annealing with the geometric rule
 
 import copy
 import random
+import time
 from math import exp
+from typing import Any, Optional
+from solution_state import SolutionState
+from profiler import PROFILER
+from optimizer_trace import TraceWriter
 
-def optimization(smartgrid, iteration: int) -> None:
+def optimization(smartgrid, iteration: Optional[int], incremental: bool = True,
+                 time_budget: Optional[float] = None,
+                 patience: Optional[int] = None,
+                 trace: Optional[TraceWriter] = None) -> dict[str, Any]:
     """
-    This function optimizes the lay-out of the cables
+    This function optimizes the lay-out of the cables, without a number of
+    iterations or with a time budget or patience it always re-lays
+    incrementally
 
     Args:
         smartgrid (Smartgrid): a smartgrid
-        iteration (int): number of iterations
+        iteration (Optional[int]): number of iterations, no limit if None
+        incremental (bool): only re-lay the cables of the changed batteries,
+                            False lays all cables of a deep copy of the
+                            model every iteration
+        time_budget (Optional[float]): seconds to optimize, no limit if None
+        patience (Optional[int]): stop after this number of iterations
+                                  without a better selection, no limit if None
+        trace (Optional[TraceWriter]): writer of every swap, no trace if None
+
+    Returns:
+        dict[str, Any]: statistics of the incremental annealing, empty when
+        all cables are laid again every iteration
     """
     
-    # initialise acceptance probability, minimum costs and best model
+    if (incremental or iteration is None or time_budget is not None or
+        patience is not None):
+        return incremental_optimization(smartgrid, iteration, time_budget,
+                                        patience, trace)
+    
+    # initialise acceptance probability, minimum costs and best model, a
+    # swap only becomes the best model when it is cheaper than the start
     acc_prob = 1
-    min_costs = 40_000
+    min_costs = smartgrid.costs()
     best_model = copy.deepcopy(smartgrid)
     
+    # the swaps are made on a copy of the model
+    with PROFILER.span('sa.copy'):
+        smartgrid.copied_model = copy.deepcopy(smartgrid)
+    
     # optimize for iteration number of iterations
     for i in range(iteration):
         # create copy of the model
-        empty_model = copy.deepcopy(smartgrid.copied_model)
+        with PROFILER.span('sa.copy'):
+            empty_model = copy.deepcopy(smartgrid.copied_model)
         
         # cost of current lay-out cables
         old_costs = smartgrid.costs()
@@ -38,21 +70,21 @@ def optimization(smartgrid, iteration: int) -> None:
         # skip if not enough capacity in the batteries
         if (house_1.energy - house_2.energy > battery_2.energy or
             house_2.energy - house_1.energy > battery_1.energy):
+            PROFILER.count('sa.skipped')
             continue
         
-        # remove connection of house with battery
-        battery_1.remove_house(house_1)
-        battery_2.remove_house(house_2)
-        
-        # add different house
-        battery_1.add_house(house_2)
-        battery_2.add_house(house_1)
-        
-        # changed_copy
-        changed_empty_model = copy.deepcopy(smartgrid.copied_model)
+        with PROFILER.span('sa.swap'):
+            # remove connection of house with battery
+            battery_1.remove_house(house_1)
+            battery_2.remove_house(house_2)
+            
+            # add different house
+            battery_1.add_house(house_2)
+            battery_2.add_house(house_1)
         
         # create the cables
-        smartgrid.copied_model.lay_cables(smartgrid.copied_model.batteries)
+        with PROFILER.span('sa.reroute'):
+            smartgrid.copied_model.lay_cables(smartgrid.copied_model.batteries)
         
         # calculate the new costs
         new_costs = smartgrid.copied_model.costs()
@@ -62,16 +94,243 @@ def optimization(smartgrid, iteration: int) -> None:
         acc_prob = acc_prob / (1 + 0.1 * acc_prob)
         
         # if new lay-out has less costs or with certain probability accept change
-        if new_costs < min_costs:
-            best_model = smartgrid.copied_model
-            min_costs = new_costs
+        with PROFILER.span('sa.accept'):
+            if new_costs < min_costs:
+                best_model = smartgrid.copied_model
+                min_costs = new_costs
+                
+            accepted = new_costs < old_costs or random.random() <= acc_prob
             
-        if new_costs < old_costs or random.random() <= acc_prob:
-            smartgrid.copy_optimize()
-            # empty_model = changed_empty_model
+            if accepted:
+                smartgrid.copy_optimize()
+                PROFILER.count('sa.accepted')
+            else:
+                PROFILER.count('sa.rejected')
+        
+        if trace is not None:
+            trace.write(i, acc_prob, old_costs, new_costs, accepted, min_costs)
             
         smartgrid.copied_model = empty_model
     
     # make the smartgrid the best selection of the iterated models
     smartgrid.copied_model = best_model
     smartgrid.copy_optimize()
+    
+    return {}
+
+def incremental_optimization(smartgrid, iteration: Optional[int],
+                             time_budget: Optional[float] = None,
+                             patience: Optional[int] = None,
+                             trace: Optional[TraceWriter] = None) -> dict[str, Any]:
+    """
+    This function optimizes the lay-out of the cables on a solution state,
+    only the cables of the two batteries changed by a swap are laid again.
+    The smartgrid itself gets the best selection, it is not copied
+
+    Args:
+        smartgrid (Smartgrid): a smartgrid
+        iteration (Optional[int]): number of iterations, no limit if None
+        time_budget (Optional[float]): seconds to optimize, no limit if None
+        patience (Optional[int]): stop after this number of iterations
+                                  without a better selection, no limit if None
+        trace (Optional[TraceWriter]): writer of every swap, no trace if None
+
+    Returns:
+        dict[str, Any]: statistics of anneal
+    """
+    
+    # anneal the state and lay the cables of the best selection
+    state = SolutionState.from_model(smartgrid)
+    stats = anneal(state, iteration, time_budget, patience, trace)
+    state.apply(smartgrid)
+    smartgrid.lay_cables(smartgrid.batteries)
+    
+    return stats
+
+def anneal(state: SolutionState, iteration: Optional[int],
+           time_budget: Optional[float] = None,
+           patience: Optional[int] = None,
+           trace: Optional[TraceWriter] = None) -> dict[str, Any]:
+    """
+    This function swaps houses between the batteries of a solution state,
+    every swap is undone so every swap starts from the first selection like
+    the full optimization, an accepted swap only sets the costs the next
+    swaps are compared with. The state is left with the best selection of
+    houses. It stops at the first of the iteration, time and patience
+    limits, or when it is interrupted, so the best selection so far is
+    never lost
+
+    Args:
+        state (SolutionState): a solution state
+        iteration (Optional[int]): number of iterations, no limit if None
+        time_budget (Optional[float]): seconds to optimize, no limit if None
+        patience (Optional[int]): stop after this number of iterations
+                                  without a better selection, no limit if None
+        trace (Optional[TraceWriter]): writer of every swap, no trace if None
+
+    Returns:
+        dict[str, Any]: initial and best costs, the number of iterations,
+        of accepted, rejected and skipped swaps, and why it stopped
+    """
+    
+    batteries = list(range(len(state.battery_points)))
+    
+    # initialise acceptance probability, costs and best state
+    acc_prob = 1
+    old_costs = state.costs()
+    min_costs = old_costs
+    best = state.snapshot()
+    stats = {'initial': old_costs, 'costs': old_costs, 'iterations': 0,
+             'accepted': 0, 'rejected': 0, 'skipped': 0, 'stopped': 'iterations'}
+    
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    i = last_improvement = 0
+    
+    try:
+        while iteration is None or i < iteration:
+            # stop when out of time or when the costs do not improve anymore
+            if deadline is not None and time.perf_counter() >= deadline:
+                stats['stopped'] = 'time'
+                break
+            if patience is not None and i - last_improvement >= patience:
+                stats['stopped'] = 'patience'
+                break
+            
+            i += 1
+            
+            # select 2 different random batteries
+            battery_1, battery_2 = random.sample(batteries, 2)
+            
+            # select random house with lower priority
+            house_1 = random.choice(state.houses[battery_1])
+            house_2 = random.choice(state.houses[battery_2])
+            
+            # skip if not enough capacity in the batteries
+            energy_1, energy_2 = state.house_energy[house_1], state.house_energy[house_2]
+            if (energy_1 - energy_2 > state.remaining[battery_2] or
+                energy_2 - energy_1 > state.remaining[battery_1]):
+                stats['skipped'] += 1
+                continue
+            
+            # swap the houses, only the cables of the changed batteries are laid
+            with PROFILER.span('sa.swap'):
+                undo = state.swap(house_1, house_2)
+            
+            # calculate the new costs
+            new_costs = state.costs()
+            
+            # acceptance probability
+            acc_prob = acc_prob / (1 + 0.1 * acc_prob)
+            
+            # remember the best state
+            if new_costs < min_costs:
+                with PROFILER.span('sa.copy'):
+                    best = state.snapshot()
+                min_costs = new_costs
+                last_improvement = i
+            
+            # if new lay-out has less costs or with certain probability accept change
+            with PROFILER.span('sa.accept'):
+                accepted = new_costs < old_costs or random.random() <= acc_prob
+                
+                if trace is not None:
+                    trace.write(i, acc_prob, old_costs, new_costs, accepted, min_costs)
+                
+                if accepted:
+                    old_costs = new_costs
+                    stats['accepted'] += 1
+                else:
+                    stats['rejected'] += 1
+            
+            # go back to the first selection
+            with PROFILER.span('sa.undo'):
+                state.undo(undo)
+    
+    except KeyboardInterrupt:
+        stats['stopped'] = 'interrupted'
+    
+    stats['iterations'] = i
+    
+    # leave the state with the best selection of the iterations
+    state.restore(best)
+    stats['costs'] = min_costs
+    
+    for key in ('accepted', 'rejected', 'skipped'):
+        PROFILER.count('sa.' + key, stats[key])
+    
+    return stats
+
+def metropolis(state: SolutionState, iteration: int, temperature: float,
+               trace: Optional[TraceWriter] = None) -> dict[str, Any]:
+    """
+    This function swaps houses between the batteries of a solution state at
+    a fixed temperature, accepted swaps are kept and the state is left in
+    its last state
+
+    Args:
+        state (SolutionState): a solution state
+        iteration (int): number of iterations
+        temperature (float): temperature of the Metropolis criterion
+        trace (Optional[TraceWriter]): writer of every swap, no trace if None
+
+    Returns:
+        dict[str, Any]: last and best costs, best selection, and the number
+        of accepted, rejected and skipped swaps
+    """
+    
+    batteries = list(range(len(state.battery_points)))
+    
+    old_costs = state.costs()
+    stats = {'costs': old_costs, 'best_costs': old_costs,
+             'best_selection': state.get_selection(),
+             'accepted': 0, 'rejected': 0, 'skipped': 0}
+    
+    for i in range(iteration):
+        # select 2 different random batteries and a house of both
+        battery_1, battery_2 = random.sample(batteries, 2)
+        house_1 = random.choice(state.houses[battery_1])
+        house_2 = random.choice(state.houses[battery_2])
+        
+        # skip if not enough capacity in the batteries
+        energy_1, energy_2 = state.house_energy[house_1], state.house_energy[house_2]
+        if (energy_1 - energy_2 > state.remaining[battery_2] or
+            energy_2 - energy_1 > state.remaining[battery_1]):
+            stats['skipped'] += 1
+            continue
+        
+        # swap the houses, only the cables of the changed batteries are laid
+        with PROFILER.span('sa.swap'):
+            undo = state.swap(house_1, house_2)
+        new_costs = state.costs()
+        
+        # Metropolis criterion
+        with PROFILER.span('sa.accept'):
+            accept = (new_costs <= old_costs or
+                      random.random() < exp((old_costs - new_costs) / temperature))
+        
+        if trace is not None:
+            trace.write(i, temperature, old_costs, new_costs, accept,
+                        min(stats['best_costs'], new_costs) if accept else stats['best_costs'])
+        
+        if accept:
+            old_costs = new_costs
+            stats['accepted'] += 1
+            
+            # remember the best selection
+            if new_costs < stats['best_costs']:
+                stats['best_costs'] = new_costs
+                with PROFILER.span('sa.copy'):
+                    stats['best_selection'] = state.get_selection()
+            continue
+        
+        # reject the change
+        with PROFILER.span('sa.undo'):
+            state.undo(undo)
+        stats['rejected'] += 1
+    
+    stats['costs'] = old_costs
+    
+    for key in ('accepted', 'rejected', 'skipped'):
+        PROFILER.count('sa.' + key, stats[key])
+    
+    return stats
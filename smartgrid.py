@@ -3,23 +3,32 @@
 from __future__ import annotations
 import mesa
 from typing import Union, Optional
-import csv
+from district import read_objects
 from operator import attrgetter
 from Agents.cable import Cable
 from Agents.house import House
 from Agents.battery import Battery
+from occupancy import OccupancyGrid
+from cable_segments import CableSegments
 import json
+import numpy as np
         
 
 class SmartGrid(mesa.Model):
-    def __init__(self, district: int) -> None:
+    def __init__(self, district: int, cable_agents: bool = False) -> None:
         # objects
         self.houses: list[House] = self.add_objects(district, 'houses')
         self.batteries: list[House] = self.add_objects(district, 'batteries')
+        
+        # cables as runs of cells, agents are only built for the visualisation
+        self.cable_segments = CableSegments()
         self.cables: list[Cable] = []
         self.district = district
         self.information = []
 
+        # distances of the houses to the batteries
+        self.distances: Optional[np.ndarray] = None
+
         # total numher of cable
         self.num_cables = 0
 
@@ -35,6 +44,14 @@ class SmartGrid(mesa.Model):
         for i in self.batteries:
             self.grid.place_agent(i, (i.x, i.y))
 
+        # occupancy of the cells for fast lookups
+        self.occupancy = OccupancyGrid(width + 1, height + 1,
+                                       [i.unique_id for i in self.batteries])
+        for i in self.houses:
+            self.occupancy.place_house(i.x, i.y)
+        for i in self.batteries:
+            self.occupancy.place_battery(i.unique_id, i.x, i.y)
+
         # order placement
         self.placement_order()
 
@@ -44,6 +61,10 @@ class SmartGrid(mesa.Model):
         
         # get representation info
         self.get_information()
+        
+        # place a mesa agent on every cable for the visualisation
+        if cable_agents:
+            self.cables = self.cable_segments.place_agents(self)
 
     def bound(self) -> tuple[int, int]:
         """
@@ -63,24 +84,40 @@ class SmartGrid(mesa.Model):
 
         return (max_x.x, max_y.y)
 
+    def distance_matrix(self) -> np.ndarray:
+        """
+        This function gives the Manhattan distance of every house to every
+        battery, it is calculated once and kept on the model
+
+        Returns:
+            np.ndarray: (houses, batteries) distances, a house is row
+            unique_id - 1 and a battery column unique_id - 1
+        """
+
+        if self.distances is None:
+            houses = sorted(self.houses, key=attrgetter('unique_id'))
+            batteries = sorted(self.batteries, key=attrgetter('unique_id'))
+            house_points = np.array([(house.x, house.y) for house in houses])
+            battery_points = np.array([(battery.x, battery.y) for battery in batteries])
+
+            self.distances = np.abs(house_points[:, None, :] -
+                                    battery_points[None, :, :]).sum(axis=2)
+
+        return self.distances
+
     def placement_order(self) -> None:
         """
         This function finds the order in which the houses get
         their battery assigned and sort the house list
         """
 
-        for house in self.houses:
-            # list of distances to all the batteries
-            dist_batteries = []
-            for battery in self.batteries:
-                # add distance to list
-                dist_batteries.append(house.distance(battery))
-
-            # sort the list in ascending order
-            dist_batteries.sort()
+        # the closest and second closest battery of every house
+        dist = np.partition(self.distance_matrix(), (0, 1), axis=1)
+        priority = dist[:, 1] - dist[:, 0]
 
-            # assign priority value to house
-            house.priority = dist_batteries[1] - dist_batteries[0]
+        # assign priority value to house
+        for house in self.houses:
+            house.priority = int(priority[house.unique_id - 1])
 
         # sort houses based on priority
         self.houses.sort(key=lambda x: x.priority, reverse=True)
@@ -91,42 +128,33 @@ class SmartGrid(mesa.Model):
         for every house and assigns the house to that battery
         """
 
+        dist = self.distance_matrix()
+
+        # the houses do not use up the capacity of the batteries here, the
+        # fit is decided on the full capacity
+        energy = np.array([house.energy for house in
+                           sorted(self.houses, key=attrgetter('unique_id'))])
+        capacity = np.array([battery.capacity for battery in self.batteries])
+        fits_all = capacity[None, :] - energy[:, None] >= 0
+
         # find closest battery for every house
         for house in self.houses:
-            # smallest distance to a battery
-            min_dist = -1.0
-            
-            # index battery
-            index = 0
-            
-            # best battery index for the house
+            fits = fits_all[house.unique_id - 1]
+
+            # the first battery if no battery has enough capacity
             best_index = 0
-            
-            for battery in self.batteries:
-                # distance to battery
-                dist = house.distance(battery)
-
-                # if the first battery, make it the smallest distance and connect
-                if min_dist == -1 and house.check_connection(battery):
-                    min_dist = dist
-                    best_index = index
-                # if distance to new battery is smaller than minimum, update
-                elif min_dist > dist and house.check_connection(battery):
-                    min_dist = dist
-                    best_index = index
-                    
-                index += 1
-            house.connect(self.batteries[best_index])
-            self.batteries[best_index].houses.append(house)
+            if fits.any():
+                best_index = int(np.where(fits, dist[house.unique_id - 1], np.inf).argmin())
+
+            # add_house lowers the remaining energy of the battery, below
+            # zero when it is over capacity, nothing reads it afterwards
+            self.batteries[best_index].add_house(house)
                     
     def lay_cable(self) -> None:
         """
         This function connects the houses with the batteries by placing cables
         """
 
-        # unique id for cables
-        cable_id = 1000
-
         # create and place the cables for every house
         for house in self.houses:
             # cable list per house
@@ -177,30 +205,31 @@ class SmartGrid(mesa.Model):
                     y2.reverse()
                     cor_arr = list(set((y2 + x1 + y1)))
 
-                # get all contents of the grid of the locations
-                content = self.grid.get_cell_list_contents(cor_arr)
+                # count the other batteries on the locations
+                blocking = self.occupancy.count_batteries(cor_arr, battery.unique_id)
                 
                 # check if not destination battery
-                for bat in self.batteries:
-                    if bat in content and not (bat.x == battery.x and bat.y == battery.y):
-                        battery_block = True
-                        i += 1
-
-            cable_id = 0
-            for cor in cor_arr:
-                self.add_cable(cor[0], cor[1], house, cable_id)
-                # update cable id
-                cable_id += 1
+                if blocking > 0:
+                    battery_block = True
+                    i += blocking
+
+            self.add_cables(house, cor_arr)
             
-    def add_cable(self, x, y, house, cable_id):
-        new_cable = Cable(cable_id, self, x, y, 0)
-        house.add_cable(new_cable)
+    def add_cables(self, house: House, points: list[tuple[int, int]]) -> None:
+        """
+        This function lays the cables of a house on unique points
 
+        Args:
+            house (House): a connected house
+            points (list[tuple[int, int]]): points of the cables
+        """
+        
+        battery_id = house.connection.unique_id
+        
         # update number of cables
-        self.num_cables += 1
-
-        # place cable in the grid
-        self.grid.place_agent(new_cable, (x, y))
+        self.num_cables += self.cable_segments.add(battery_id, points,
+                                                   house.unique_id)
+        self.occupancy.place_cables(battery_id, points)
 
     def costs(self) -> int:
         """
@@ -228,6 +257,9 @@ class SmartGrid(mesa.Model):
         # add general information to information list
         self.information.append(dct)
         
+        # the cables of every house
+        house_cables = self.cable_segments.cells_by_house()
+        
         # for every battery make a dictionary with its information
         for battery in self.batteries:
             # dictionary of battery
@@ -246,8 +278,8 @@ class SmartGrid(mesa.Model):
                 
                 # add location of all cables connected to houses
                 # in the dictionary of information houses
-                for cable in house.cables:
-                    dct_house["cables"].append(str(cable.x) + "," + str(cable.y))
+                for x, y in house_cables.get(house.unique_id, []):
+                    dct_house["cables"].append(str(x) + "," + str(y))
                 dct["houses"].append(dct_house)
             
             # add all information to self.information
@@ -265,43 +297,14 @@ class SmartGrid(mesa.Model):
             Union[list[House], list[Battery]]: a list with all the houses or batteries
         """
 
-        # path to data
-        path = 'Huizen&Batterijen/district_' + str(district) + '/district-' + str(district) + '_' +  info + '.csv'
-
-        # list with the information
+        # the district is parsed once per process
         lst = []
-
-        # add the information to the list
-        with open(path, 'r') as csv_file:
-            data = csv.reader(csv_file)
-
-            # index to skip header
-            count = 0
-
-            # go through all rows except the first
-            for line in data:
-                # skip header
-                if count == 0:
-                    count += 1
-                    continue
-
-                # convert the data to a neat list with floats
-                if not line[0].isnumeric():
-                    neat_data = line[0].split(',')
-                    line = neat_data + [line[1]]
-
-                # information
-                x = int(line[0])
-                y = int(line[1])
-                energy = float(line[2])
-
-                # append a house or Battery
-                if info == 'houses':
-                    lst.append(House(count, self, x, y, energy))
-                else:
-                    lst.append(Battery(count, self, x, y, energy))
-
-                count += 1
+        for count, (x, y, energy) in enumerate(read_objects(district, info), 1):
+            # append a house or Battery
+            if info == 'houses':
+                lst.append(House(count, self, x, y, energy))
+            else:
+                lst.append(Battery(count, self, x, y, energy))
 
         return lst
 
@@ -3,22 +3,43 @@
 from __future__ import annotations
 import mesa
 from typing import Union, Optional, Any
-import csv
+from district import read_objects
 from operator import attrgetter
 from Agents.battery import Battery
 from Agents.house import House
 import json
-import copy
 from lay_cables import *
 import random
+import numpy as np
 from simulated_annealing import optimization
-from distribute import distribute
+from parallel_annealing import multi_chain_optimization
+from parallel_annealing import replica_exchange_optimization
+from repair import repair
+from route_cache import ROUTE_CACHE, CACHE_SIZE, PATH_CACHE, PATH_CACHE_CELLS
+from profiler import PROFILER
+from optimizer_trace import open_trace
+from cable_segments import CableSegments
   
 class SmartGrid(mesa.Model):
-    def __init__(self, district: int) -> None:
+    def __init__(self, district: int, incremental: bool = True,
+                 iteration: Optional[int] = 500, chains: int = 1,
+                 replicas: int = 1, cache_size: int = CACHE_SIZE,
+                 profile: bool = False, time_budget: Optional[float] = None,
+                 patience: Optional[int] = None,
+                 trace: Optional[str] = None, router: str = 'greedy',
+                 cable_agents: bool = False, engine: str = 'scalar',
+                 path_cache_cells: int = PATH_CACHE_CELLS) -> None:
+        # time the stages and count the work when profiling
+        PROFILER.enabled = profile
+        PROFILER.reset()
+        
         # objects
-        self.houses: list[House] = self.add_objects(district, 'houses')
-        self.batteries: list[House] = self.add_objects(district, 'batteries')
+        with PROFILER.span('loading'):
+            self.houses: list[House] = self.add_objects(district, 'houses')
+            self.batteries: list[House] = self.add_objects(district, 'batteries')
+        
+        # cables as runs of cells, agents are only built for the visualisation
+        self.cable_segments = CableSegments()
         self.cables: list[Cable] = []
         
         # the district which is chosen
@@ -27,32 +48,79 @@ class SmartGrid(mesa.Model):
         # variable for representation
         self.information: list[dict[str, Any]] = []
         
-        # list of not connected houses
+        # houses which fit in no battery, even after the repair. They have
+        # no cables and no costs and the optimizers never move them, so a
+        # smartgrid with such houses is not a solution: callers check this
+        # list before they use the costs
         self.houses_not_placed: list[House] = []
+        
+        # distances of the houses to the batteries
+        self.distances: Optional[np.ndarray] = None
+        
+        # statistics of the annealing, of the chains and of the replicas
+        self.anneal_stats: dict[str, Any] = {}
+        self.chain_stats: list[dict[str, Any]] = []
+        self.tempering_stats: dict[str, Any] = {}
+        
+        # spans and counters of the profiler
+        self.profile: dict[str, Any] = {}
+        
+        # copy of the model the full optimization swaps houses in, only
+        # made when it runs, the other optimizers change the model itself
+        self.copied_model: Optional[SmartGrid] = None
+        
+        # routing engine of the cables
+        if router not in ROUTERS:
+            raise ValueError('unknown router ' + repr(router))
+        self.router = router
+        
+        # distance engine of the greedy router
+        if engine not in ENGINES:
+            raise ValueError('unknown engine ' + repr(engine))
+        self.engine = engine
+        
+        # number of routed batteries the optimizers remember
+        self.cache_size = cache_size
+        ROUTE_CACHE.resize(cache_size)
+        
+        # number of cells of L-shaped paths the merges remember
+        self.path_cache_cells = path_cache_cells
+        PATH_CACHE.resize(path_cache_cells)
  
         # total numher of cable
         self.num_cables = 0
  
         # create the grid
-        self.create_grid()
+        with PROFILER.span('create_grid'):
+            self.create_grid()
  
         # order placement
-        self.placement_order()
+        with PROFILER.span('placement_order'):
+            self.placement_order()
  
         # link houses
-        self.link_houses()
-        
-        # create copied model
-        self.copied_model = copy.deepcopy(self)
+        with PROFILER.span('link_houses'):
+            self.link_houses()
         
         # lay the cables
-        self.lay_cables(self.batteries)
+        with PROFILER.span('lay_cables'):
+            self.lay_cables(self.batteries)
         
         # optimize connections
-        self.optimization(500)
+        with PROFILER.span('optimization'):
+            self.optimization(iteration, incremental, chains, replicas,
+                              time_budget, patience, trace)
        
         # get representation info
-        self.get_information()   
+        with PROFILER.span('get_information'):
+            self.get_information()
+        
+        if profile:
+            self.profile = PROFILER.to_dict()
+        
+        # place a mesa agent on every cable for the visualisation
+        if cable_agents:
+            self.cables = self.cable_segments.place_agents(self)
  
     def bound(self) -> tuple[int, int]:
         """
@@ -84,76 +152,80 @@ class SmartGrid(mesa.Model):
         for battery in self.batteries:
             self.grid.place_agent(battery, (battery.x, battery.y))
                 
+    def distance_matrix(self) -> np.ndarray:
+        """
+        This function gives the Manhattan distance of every house to every
+        battery, it is calculated once and kept on the model
+
+        Returns:
+            np.ndarray: (houses, batteries) distances, a house is row
+            unique_id - 1 and a battery column unique_id - 1
+        """
+        
+        if self.distances is None:
+            houses = sorted(self.houses, key=attrgetter('unique_id'))
+            batteries = sorted(self.batteries, key=attrgetter('unique_id'))
+            house_points = np.array([(house.x, house.y) for house in houses])
+            battery_points = np.array([(battery.x, battery.y) for battery in batteries])
+            
+            self.distances = np.abs(house_points[:, None, :] -
+                                    battery_points[None, :, :]).sum(axis=2)
+        
+        return self.distances
+                
     def placement_order(self) -> None:
         """
         This function finds the order in which the houses get
         their battery assigned and sort the house list
         """
  
+        # the closest and fifth closest battery of every house
+        dist = np.partition(self.distance_matrix(), (0, 4), axis=1)
+        priority = dist[:, 4] - dist[:, 0]
+        
+        # assign priority value to house
         for house in self.houses:
-            # list of distances to all the batteries
-            dist_batteries = []
-            
-            for battery in self.batteries:
-                # add distance to list
-                dist_batteries.append(house.distance(battery))
- 
-            # sort the list in ascending order
-            dist_batteries.sort()
- 
-            # assign priority value to house
-            house.priority = dist_batteries[4] - dist_batteries[0]
+            house.priority = int(priority[house.unique_id - 1])
  
         # sort houses based on priority
         self.houses.sort(key=lambda x: x.priority, reverse=True)
  
     def link_houses(self) -> None:
         """
-        This function finds the two closest batteries with enough capacity
+        This function finds the closest battery with enough capacity
         for every house and assigns the house to that battery
         """
  
-        # all placed houses
-        houses_placed = []
+        dist = self.distance_matrix()
+        batteries = sorted(self.batteries, key=attrgetter('unique_id'))
+        
+        # remaining capacity of every battery
+        energy = np.array([battery.energy for battery in batteries])
         
-        # find closest battery for every house
+        # find closest battery with enough capacity for every house
         for house in self.houses:
-            # smallest distance to a battery
-            min_dist = -1.0
-           
-            # boolean to check if the house can connect to a battery
-            battery_found = False
-           
-            # check for all batteries
-            for battery in self.batteries:
-                # distance to battery
-                dist = house.distance(battery)
- 
-                # if a connection can be made, remember that
-                if min_dist == -1 and house.check_connection(battery):
-                    min_dist = dist
-                    best_battery = battery
-                    battery_found = True
-                # if distance to new battery is smaller than minimum, update
-                elif min_dist > dist and house.check_connection(battery):
-                    min_dist = dist
-                    best_battery = battery
-                    battery_found = True
+            fits = energy - house.energy >= 0
             
-            # remove house of houses not placed if a battery to connect to
-            # is found
-            if battery_found:
-                # add house to battery and copy all the paths in battery
-                best_battery.add_house(house)
-                best_battery.copy_all_paths()
+            # the house is not placed if no battery has enough capacity
+            if not fits.any():
+                continue
             
-                houses_placed.append(house)
+            # the first closest battery, like the loop over all batteries
+            best = int(np.where(fits, dist[house.unique_id - 1], np.inf).argmin())
+            
+            # add house to battery
+            batteries[best].add_house(house)
+            energy[best] = batteries[best].energy
         
         # get all the houses which are not placed
-        self.houses_not_placed = [house for house in self.houses if house not in houses_placed]
+        self.houses_not_placed = [house for house in self.houses if house.connection is None]
         
+        # other houses change battery to make room, houses which still do
+        # not fit stay in houses_not_placed
         if len(self.houses_not_placed) > 0:
-            distribute(self.batteries, self.houses_not_placed)
+            with PROFILER.span('repair'):
+                self.houses_not_placed = repair(self.batteries, self.houses,
+                                                self.distance_matrix())
 
     def lay_cables(self, battery_list: list[Battery]) -> None:
         """
@@ -164,8 +236,8 @@ class SmartGrid(mesa.Model):
         self.num_cables = 0
         
         for battery in battery_list:
-            while battery.get_len_paths() > 1:
-                create_merged_path(battery)
+            # connect all paths of the battery
+            merge_battery_paths(battery, self.router, self.engine)
             
             # if all paths are connected, draw all the cables
             self.num_cables += battery.lay_cables()
@@ -178,16 +250,62 @@ class SmartGrid(mesa.Model):
         
         self.houses = self.copied_model.houses
         self.cables = self.copied_model.cables
+        self.cable_segments = self.copied_model.cable_segments
         self.batteries = self.copied_model.batteries
         self.num_cables = self.copied_model.num_cables
         self.grid = self.copied_model.grid
         
-    def optimization(self, iteration: int) -> None:
+    def optimization(self, iteration: Optional[int], incremental: bool = True,
+                     chains: int = 1, replicas: int = 1,
+                     time_budget: Optional[float] = None,
+                     patience: Optional[int] = None,
+                     trace: Optional[str] = None) -> None:
         """
         This function optimizes the battery allocations
+
+        Args:
+            iteration (Optional[int]): number of iterations, no limit if None
+            incremental (bool): only re-lay the cables of the changed batteries,
+                                False lays all cables of a deep copy of
+                                the model every iteration
+            chains (int): number of parallel annealing chains
+            replicas (int): number of parallel tempering replicas
+            time_budget (Optional[float]): seconds to optimize, no limit if None
+            patience (Optional[int]): stop after this number of iterations
+                                      without a better selection, not for
+                                      the replicas
+            trace (Optional[str]): path of a csv or jsonl file to write every
+                                   swap to, not for the replicas
         """
         
-        optimization(self, iteration)
+        # the replicas exchange after every sweep, they have no patience and
+        # no trace
+        if replicas > 1 and (patience is not None or trace is not None):
+            raise ValueError('replica exchange takes no patience or trace')
+        
+        # without iterations the houses stay where link_houses put them
+        if iteration == 0:
+            return
+        
+        # parallel chains and replicas always re-lay incrementally
+        if replicas > 1:
+            self.tempering_stats = replica_exchange_optimization(
+                self, iteration, replicas, time_budget=time_budget)
+            return
+        
+        if chains > 1:
+            self.chain_stats = multi_chain_optimization(
+                self, iteration, chains, time_budget=time_budget,
+                patience=patience, trace=trace)
+            return
+        
+        writer = open_trace(trace)
+        try:
+            self.anneal_stats = optimization(self, iteration, incremental,
+                                             time_budget, patience, writer)
+        finally:
+            if writer is not None:
+                writer.close()
                                                
     def costs(self) -> int:
         """
@@ -215,6 +333,9 @@ class SmartGrid(mesa.Model):
         # add general information to information list
         self.information.append(dct)
        
+        # the cables of every house
+        house_cables = self.cable_segments.cells_by_house()
+        
         # for every battery make a dictionary with its information
         for battery in self.batteries:
             # dictionary of battery
@@ -233,8 +354,8 @@ class SmartGrid(mesa.Model):
                
                 # add location of all cables connected to houses
                 # in the dictionary of information houses
-                for cable in house.cables:
-                    dct_house["cables"].append(str(cable.x) + "," + str(cable.y))
+                for x, y in house_cables.get(house.unique_id, []):
+                    dct_house["cables"].append(str(x) + "," + str(y))
                 dct["houses"].append(dct_house)
            
             # add all information to self.information
@@ -252,43 +373,14 @@ class SmartGrid(mesa.Model):
             Union[list[House], list[Battery]]: a list with all the houses or batteries
         """
  
-        # path to data
-        path = 'Huizen&Batterijen/district_' + str(district) + '/district-' + str(district) + '_' +  info + '.csv'
- 
-        # list with the information
+        # the district is parsed once per process
         lst = []
- 
-        # add the information to the list
-        with open(path, 'r') as csv_file:
-            data = csv.reader(csv_file)
- 
-            # index to skip header
-            count = 0
- 
-            # go through all rows except the first
-            for line in data:
-                # skip header
-                if count == 0:
-                    count += 1
-                    continue
- 
-                # convert the data to a neat list with floats
-                if not line[0].isnumeric():
-                    neat_data = line[0].split(',')
-                    line = neat_data + [line[1]]
- 
-                # information
-                x = int(line[0])
-                y = int(line[1])
-                energy = float(line[2])
- 
-                # append a house or Battery
-                if info == 'houses':
-                    lst.append(House(count, self, x, y, energy))
-                else:
-                    lst.append(Battery(count, self, x, y, energy))
- 
-                count += 1
+        for count, (x, y, energy) in enumerate(read_objects(district, info), 1):
+            # append a house or Battery
+            if info == 'houses':
+                lst.append(House(count, self, x, y, energy))
+            else:
+                lst.append(Battery(count, self, x, y, energy))
  
         return lst
  
@@ -0,0 +1,320 @@
+"""
+This python file contains a compact solution state for the optimizers,
+the houses and batteries are indexes into arrays instead of mesa agents
+"""
+
+from __future__ import annotations
+from typing import Optional
+import numpy as np
+from lay_cables import merged_cells
+from route_cache import RouteCache, ROUTE_CACHE
+from profiler import PROFILER
+
+# costs of a cable and of a battery
+CABLE_COST = 9
+BATTERY_COST = 5000
+
+
+class SolutionState:
+    def __init__(self, house_points: list[tuple[int, int]], house_energy: list[float],
+                 battery_points: list[tuple[int, int]], capacity: list[float],
+                 cache: RouteCache = ROUTE_CACHE, router: str = 'greedy',
+                 engine: str = 'scalar') -> None:
+        # houses ordered by id, batteries in the order of the smartgrid
+        self.house_points = list(house_points)
+        self.house_energy = np.asarray(house_energy, dtype=np.float64)
+        self.battery_points = list(battery_points)
+        self.capacity = np.asarray(capacity, dtype=np.float64)
+
+        # battery index per house, -1 if not connected
+        self.assignment = np.full(len(self.house_points), -1, dtype=np.int64)
+
+        # remaining capacity per battery
+        self.remaining = self.capacity.copy()
+
+        # house indexes per battery, in order of connection and in path order
+        self.houses: list[list[int]] = [[] for _ in self.battery_points]
+        self.paths: list[list[int]] = [[] for _ in self.battery_points]
+
+        # cable cells and number of cables per battery
+        self.cells: list[list[tuple[int, int]]] = [[point] for point in self.battery_points]
+        self.num_cables = np.ones(len(self.battery_points), dtype=np.int64)
+
+        # routed cables of earlier house selections
+        self.cache = cache
+        
+        # routing engine of the cables
+        self.router = router
+        self.engine = engine
+
+    @classmethod
+    def from_model(cls, model, cache: RouteCache = ROUTE_CACHE) -> SolutionState:
+        """
+        This function creates the state of a smartgrid, with the routing
+        and distance engine of the smartgrid
+
+        Args:
+            model (Smartgrid): a smartgrid
+            cache (RouteCache): cache of routed batteries
+
+        Returns:
+            SolutionState: the state with the houses of the smartgrid
+        """
+
+        houses = sorted(model.houses, key=lambda x: x.unique_id)
+        batteries = model.batteries
+        state = cls([(house.x, house.y) for house in houses],
+                    [house.energy for house in houses],
+                    [(battery.x, battery.y) for battery in batteries],
+                    [battery.capacity for battery in batteries], cache,
+                    model.router, model.engine)
+
+        house_index = {house.unique_id: i for i, house in enumerate(houses)}
+
+        for i, battery in enumerate(batteries):
+            # keep the order of the houses and of the paths
+            state.houses[i] = [house_index[house.unique_id] for house in battery.houses]
+            state.paths[i] = [house_index[house_id] for house_id in battery.path_map]
+            state.assignment[state.houses[i]] = i
+            state.remaining[i] = battery.energy
+            state.route(i)
+
+        return state
+
+    def route(self, battery: int) -> int:
+        """
+        This function lays the cables of a battery, a house selection
+        that was routed before is taken from the cache
+
+        Args:
+            battery (int): index of the battery
+
+        Returns:
+            int: number of cables of the battery
+        """
+
+        all_paths = [[self.battery_points[battery]]]
+        all_paths += [[self.house_points[house]] for house in self.paths[battery]]
+
+        # every cell of the merged path is a cable
+        self.cells[battery] = merged_cells(all_paths, self.cache, self.router,
+                                           self.engine)
+        self.num_cables[battery] = len(self.cells[battery])
+
+        return self.num_cables[battery]
+
+    def costs(self) -> int:
+        """
+        This function calculates the total costs for the cables and batteries
+
+        Returns:
+            int: total costs
+        """
+
+        return (CABLE_COST * int(self.num_cables.sum()) +
+                BATTERY_COST * len(self.battery_points))
+
+    def add(self, house: int, battery: int,
+            index: Optional[tuple[int, int]] = None) -> None:
+        """
+        This function connects a house to a battery, without laying cables
+
+        Args:
+            house (int): index of a not connected house
+            battery (int): index of the battery
+            index (Optional[tuple[int, int]]): position in the houses and in
+                                               the paths, at the end if None
+        """
+
+        self.remaining[battery] -= self.house_energy[house]
+        self.assignment[house] = battery
+
+        if index is None:
+            self.houses[battery].append(house)
+            self.paths[battery].append(house)
+            return
+
+        self.houses[battery].insert(index[0], house)
+        self.paths[battery].insert(index[1], house)
+
+    def remove(self, house: int) -> tuple[int, int]:
+        """
+        This function disconnects a house, without laying cables
+
+        Args:
+            house (int): index of a connected house
+
+        Returns:
+            tuple[int, int]: the position the house had in the houses and
+            in the paths of its battery
+        """
+
+        battery = self.assignment[house]
+        house_index = self.houses[battery].index(house)
+        path_index = self.paths[battery].index(house)
+
+        del self.houses[battery][house_index]
+        del self.paths[battery][path_index]
+        self.remaining[battery] += self.house_energy[house]
+        self.assignment[house] = -1
+
+        return house_index, path_index
+
+    def swap(self, house_1: int, house_2: int) -> tuple:
+        """
+        This function swaps the batteries of two houses and lays the cables
+        of both batteries again
+
+        Args:
+            house_1 (int): index of a connected house
+            house_2 (int): index of a house of another battery
+
+        Returns:
+            tuple: undo record to reverse the swap with undo
+        """
+
+        battery_1, battery_2 = self.assignment[house_1], self.assignment[house_2]
+        cables = (self.cells[battery_1], self.num_cables[battery_1],
+                  self.cells[battery_2], self.num_cables[battery_2])
+
+        # remove both houses and add them to the other battery
+        index_1 = self.remove(house_1)
+        index_2 = self.remove(house_2)
+        self.add(house_2, battery_1)
+        self.add(house_1, battery_2)
+
+        with PROFILER.span('sa.reroute'):
+            self.route(battery_1)
+            self.route(battery_2)
+
+        return (house_1, battery_1, index_1, house_2, battery_2, index_2, cables)
+
+    def undo(self, record: tuple) -> None:
+        """
+        This function reverses a swap, the old cables are put back
+
+        Args:
+            record (tuple): undo record of swap
+        """
+
+        house_1, battery_1, index_1, house_2, battery_2, index_2, cables = record
+
+        self.remove(house_2)
+        self.remove(house_1)
+        self.add(house_1, battery_1, index_1)
+        self.add(house_2, battery_2, index_2)
+
+        (self.cells[battery_1], self.num_cables[battery_1],
+         self.cells[battery_2], self.num_cables[battery_2]) = cables
+
+    def snapshot(self) -> tuple:
+        """
+        This function remembers the houses and cables of all batteries
+
+        Returns:
+            tuple: snapshot to go back to with restore
+        """
+
+        return (self.assignment.copy(), self.remaining.copy(),
+                [list(houses) for houses in self.houses],
+                [list(paths) for paths in self.paths],
+                list(self.cells), self.num_cables.copy())
+
+    def restore(self, snapshot: tuple) -> None:
+        """
+        This function goes back to a snapshot
+
+        Args:
+            snapshot (tuple): snapshot of snapshot
+        """
+
+        (assignment, remaining, houses, paths, cells, num_cables) = snapshot
+        self.assignment, self.remaining = assignment.copy(), remaining.copy()
+        self.houses = [list(i) for i in houses]
+        self.paths = [list(i) for i in paths]
+        self.cells, self.num_cables = list(cells), num_cables.copy()
+
+    def get_assignment(self) -> list[int]:
+        """
+        This function gives the battery of every house as a compact list
+
+        Returns:
+            list[int]: battery index per house
+        """
+
+        return self.assignment.tolist()
+
+    def set_assignment(self, assignment: list[int]) -> None:
+        """
+        This function connects the houses to the batteries of an assignment,
+        houses are added in order of index, and lays all cables
+
+        Args:
+            assignment (list[int]): battery index per house
+        """
+
+        self.assignment = np.full(len(self.house_points), -1, dtype=np.int64)
+        self.remaining = self.capacity.copy()
+        self.houses = [[] for _ in self.battery_points]
+        self.paths = [[] for _ in self.battery_points]
+
+        for house, battery in enumerate(assignment):
+            if battery != -1:
+                self.add(house, battery)
+
+        for battery in range(len(self.battery_points)):
+            self.route(battery)
+
+    def get_selection(self) -> tuple[list[list[int]], list[list[int]]]:
+        """
+        This function gives the houses of every battery in order of
+        connection and in path order, the path order decides the cables
+
+        Returns:
+            tuple[list[list[int]], list[list[int]]]: house indexes per battery
+            in order of connection and in path order
+        """
+
+        return ([list(houses) for houses in self.houses],
+                [list(paths) for paths in self.paths])
+
+    def set_selection(self, selection: tuple[list[list[int]], list[list[int]]]) -> None:
+        """
+        This function connects the houses of a selection in its order, so
+        the cables and costs are the same as where the selection was made
+
+        Args:
+            selection (tuple[list[list[int]], list[list[int]]]): house
+                indexes per battery in order of connection and in path order
+        """
+
+        houses, paths = selection
+        self.assignment = np.full(len(self.house_points), -1, dtype=np.int64)
+        self.remaining = self.capacity.copy()
+        self.houses = [list(i) for i in houses]
+        self.paths = [list(i) for i in paths]
+
+        for battery, battery_houses in enumerate(self.houses):
+            self.assignment[battery_houses] = battery
+            self.remaining[battery] -= self.house_energy[battery_houses].sum()
+            self.route(battery)
+
+    def apply(self, model) -> None:
+        """
+        This function gives the houses of a smartgrid the batteries of the
+        state, the cables of the smartgrid can then be laid again
+
+        Args:
+            model (Smartgrid): a smartgrid
+        """
+
+        houses = sorted(model.houses, key=lambda x: x.unique_id)
+        batteries = model.batteries
+
+        for house in houses:
+            house.connection = None
+
+        for i, battery in enumerate(batteries):
+            battery.set_houses([houses[house] for house in self.houses[i]],
+                               [houses[house] for house in self.paths[i]])
+            battery.num_cables = int(self.num_cables[i])
@@ -0,0 +1,273 @@
+"""
+This python file routes the cables of a battery as a rectilinear Steiner
+tree with the batched iterated 1-Steiner heuristic: points of the Hanan
+grid which shorten the minimum spanning tree of the houses and the battery
+are added until no point shortens it any more. A round costs O(n^4) time
+for n terminals, batteries with more than MAX_TERMINALS are left to the
+greedy merge
+"""
+
+from __future__ import annotations
+import numpy as np
+
+# number of candidates with a gain that are tried every round
+BATCH = 16
+
+# distance of the points which are not reachable yet
+FAR = np.iinfo(np.int64).max // 4
+
+# most terminals of a battery that is routed as a Steiner tree
+MAX_TERMINALS = 64
+
+# most distances in the trees of the candidates evaluated at once
+BLOCK_SIZE = 1 << 20
+
+def manhattan(points_1: np.ndarray, points_2: np.ndarray) -> np.ndarray:
+    """
+    This function calculates the Manhattan distances between 2 sets of points
+
+    Args:
+        points_1 (np.ndarray): (N, 2) points
+        points_2 (np.ndarray): (M, 2) points
+
+    Returns:
+        np.ndarray: (N, M) distances
+    """
+
+    return np.abs(points_1[:, None, :] - points_2[None, :, :]).sum(axis=2)
+
+def mst_tree(points: np.ndarray) -> tuple[int, np.ndarray]:
+    """
+    This function builds the rectilinear minimum spanning tree of points
+    with Prim, starting at the first point
+
+    Args:
+        points (np.ndarray): (N, 2) points, the first is the battery
+
+    Returns:
+        tuple[int, np.ndarray]: length of the tree and the parent of every
+        point in the order the points are added, the first point has none
+    """
+
+    dist = manhattan(points, points)
+    n = len(points)
+
+    best = dist[0].copy()
+    parent = np.zeros(n, dtype=np.int64)
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = True
+    order = []
+    length = 0
+
+    for _ in range(n - 1):
+        point = int(np.where(in_tree, FAR, best).argmin())
+        length += int(best[point])
+        in_tree[point] = True
+        order.append(point)
+
+        # the new point is the closest tree point for some points
+        closer = (dist[point] < best) & ~in_tree
+        parent[closer] = point
+        best = np.minimum(best, dist[point])
+
+    return length, np.array([(point, parent[point]) for point in order],
+                            dtype=np.int64).reshape(-1, 2)
+
+def mst_lengths(points: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """
+    This function calculates the length of the minimum spanning tree of the
+    points with every candidate added, in blocks of candidates so the
+    memory stays below BLOCK_SIZE distances
+
+    Args:
+        points (np.ndarray): (N, 2) points
+        candidates (np.ndarray): (C, 2) candidate points
+
+    Returns:
+        np.ndarray: (C,) length of the tree with every candidate
+    """
+
+    rows = max(1, BLOCK_SIZE // (len(points) + 1))
+
+    lengths = [block_mst_lengths(points, candidates[start:start + rows])
+               for start in range(0, len(candidates), rows)]
+
+    return np.concatenate(lengths) if lengths else np.zeros(0, dtype=np.int64)
+
+def block_mst_lengths(points: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """
+    This function calculates the length of the minimum spanning tree of the
+    points with every candidate added, all candidates at once. The trees
+    are built with Prim side by side, the candidate is the last point
+
+    Args:
+        points (np.ndarray): (N, 2) points
+        candidates (np.ndarray): (C, 2) candidate points
+
+    Returns:
+        np.ndarray: (C,) length of the tree with every candidate
+    """
+
+    n, rows = len(points), np.arange(len(candidates))
+    dist = manhattan(points, points)
+    to_candidate = manhattan(candidates, points)
+
+    # distance of every point to the tree of every candidate, points in
+    # the tree are FAR away so they are not added again
+    best = np.empty((len(candidates), n + 1), dtype=np.int64)
+    best[:, :n] = dist[0]
+    best[:, n] = to_candidate[:, 0]
+    best[:, 0] = FAR
+    done = np.zeros_like(best)
+    done[:, 0] = FAR
+    length = np.zeros(len(candidates), dtype=np.int64)
+
+    for _ in range(n):
+        point = best.argmin(axis=1)
+        length += best[rows, point]
+        done[rows, point] = FAR
+
+        # distances of the added points, the candidate is point n
+        candidate_rows = np.flatnonzero(point == n)
+        point[candidate_rows] = 0
+        added = dist[point]
+        added[candidate_rows] = to_candidate[candidate_rows]
+        column = to_candidate[rows, point]
+        column[candidate_rows] = 0
+
+        np.minimum(best[:, :n], added, out=best[:, :n])
+        np.minimum(best[:, n], column, out=best[:, n])
+        np.maximum(best, done, out=best)
+
+    return length
+
+def steiner_points(terminals: np.ndarray, batch: int = BATCH) -> np.ndarray:
+    """
+    This function finds the Steiner points of the terminals, every round
+    all points of the Hanan grid are evaluated at once and the best ones are
+    added while they still shorten the tree. Steiner points with less than
+    3 neighbours are removed, they never shorten a rectilinear tree
+
+    Args:
+        terminals (np.ndarray): (N, 2) unique points, the first is the battery
+        batch (int): number of candidates with a gain tried every round
+
+    Returns:
+        np.ndarray: (S, 2) the Steiner points
+    """
+
+    # the Hanan grid, the crossings of the lines through the terminals
+    xs, ys = np.unique(terminals[:, 0]), np.unique(terminals[:, 1])
+    candidates = np.stack(np.meshgrid(xs, ys, indexing='ij'), axis=-1).reshape(-1, 2)
+    taken = set(map(tuple, terminals.tolist()))
+    candidates = np.array([point for point in candidates.tolist()
+                           if tuple(point) not in taken],
+                          dtype=np.int64).reshape(-1, 2)
+    steiner = np.empty((0, 2), dtype=np.int64)
+    length, edges = mst_tree(terminals)
+
+    while len(candidates) > 0:
+        points = np.vstack((terminals, steiner))
+        gains = length - mst_lengths(points, candidates)
+
+        # a candidate without a gain hardly ever gets one when the tree
+        # becomes shorter, only candidates with a gain are evaluated again
+        candidates = candidates[gains > 0]
+        gains = gains[gains > 0]
+        if len(candidates) == 0:
+            break
+
+        order = np.argsort(-gains, kind='stable')[:batch]
+
+        # the best candidate is always added, the others only when they
+        # still shorten the tree with the added points
+        added = [candidates[order[0]]]
+        length -= int(gains[order[0]])
+
+        for candidate in candidates[order[1:]]:
+            points = np.vstack((terminals, steiner, added))
+            new_length = int(mst_lengths(points, candidate[None, :])[0])
+            if new_length < length:
+                added.append(candidate)
+                length = new_length
+
+        steiner = np.vstack((steiner, added))
+        is_added = np.zeros(len(candidates), dtype=bool)
+        is_added[order[:1]] = True
+        for candidate in added[1:]:
+            is_added |= (candidates == candidate).all(axis=1)
+        candidates = candidates[~is_added]
+
+        # remove the Steiner points with less than 3 neighbours
+        points = np.vstack((terminals, steiner))
+        length, edges = mst_tree(points)
+        degree = np.bincount(edges.ravel(), minlength=len(points))
+        steiner = steiner[degree[len(terminals):] >= 3]
+        length = mst_tree(np.vstack((terminals, steiner)))[0]
+
+    return steiner
+
+def l_path(point_1: tuple[int, int], point_2: tuple[int, int],
+           vertical_first: bool) -> list[tuple[int, int]]:
+    """
+    This function creates the cells of an L-shaped path between 2 points
+
+    Args:
+        point_1 (tuple[int, int]): a point
+        point_2 (tuple[int, int]): another point
+        vertical_first (bool): go vertical from point_1 first
+
+    Returns:
+        list[tuple[int, int]]: the cells from point_1 to point_2
+    """
+
+    (x_1, y_1), (x_2, y_2) = point_1, point_2
+    step_x = 1 if x_2 >= x_1 else -1
+    step_y = 1 if y_2 >= y_1 else -1
+
+    if vertical_first:
+        return ([(x_1, y) for y in range(y_1, y_2 + step_y, step_y)] +
+                [(x, y_2) for x in range(x_1 + step_x, x_2 + step_x, step_x)])
+
+    return ([(x, y_1) for x in range(x_1, x_2 + step_x, step_x)] +
+            [(x_2, y) for y in range(y_1 + step_y, y_2 + step_y, step_y)])
+
+def steiner_cells(all_paths: list[list[tuple[int, int]]],
+                  batch: int = BATCH) -> list[tuple[int, int]]:
+    """
+    This function routes the paths of a battery as a Steiner tree, every
+    edge of the tree is laid as the L-shape which shares the most cells with
+    the edges laid before it
+
+    Args:
+        all_paths (list[list[tuple[int, int]]]): the paths, the first is
+                                                 the battery
+        batch (int): number of candidates with a gain tried every round
+
+    Returns:
+        list[tuple[int, int]]: the unique cells of the tree, the battery first
+    """
+
+    terminals = list(dict.fromkeys(point for path in all_paths for point in path))
+
+    if len(terminals) < 3:
+        return list(dict.fromkeys(l_path(terminals[0], terminals[-1], True)))
+
+    terminals = np.array(terminals, dtype=np.int64)
+    points = np.vstack((terminals, steiner_points(terminals, batch)))
+    length, edges = mst_tree(points)
+
+    points = [tuple(point) for point in points.tolist()]
+    cells = {points[0]: None}
+
+    # the edges in the order the tree grows from the battery
+    for point, parent in edges.tolist():
+        path_1 = l_path(points[parent], points[point], True)
+        path_2 = l_path(points[parent], points[point], False)
+
+        shared_1 = sum(cell in cells for cell in path_1)
+        shared_2 = sum(cell in cells for cell in path_2)
+
+        cells.update(dict.fromkeys(path_1 if shared_1 >= shared_2 else path_2))
+
+    return list(cells)
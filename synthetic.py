@@ -0,0 +1,98 @@
+"""
+This python file generates seeded synthetic districts of any size, they
+are written as csv files like the bundled districts so every model can
+load them by name
+"""
+
+from __future__ import annotations
+import csv
+import os
+import numpy as np
+from district import DATA_PATH, csv_path
+
+# energy of the houses of the bundled districts lies in this range
+MIN_ENERGY = 25.0
+MAX_ENERGY = 75.0
+
+# placement_order compares the closest and the fifth closest battery
+MIN_BATTERIES = 5
+
+
+def district_name(houses: int, batteries: int, width: int, height: int,
+                  slack: float, seed: int) -> str:
+    """
+    This function gives the name of a synthetic district, it is used as
+    district by the models
+
+    Args:
+        houses (int): number of houses
+        batteries (int): number of batteries
+        width (int): width of the grid
+        height (int): height of the grid
+        slack (float): fraction of spare capacity of the batteries
+        seed (int): seed of the district
+
+    Returns:
+        str: name of the district
+    """
+
+    return 'synthetic-{}-{}-{}x{}-{}-{}'.format(houses, batteries, width,
+                                                height, slack, seed)
+
+
+def generate_district(houses: int = 150, batteries: int = 5, width: int = 51,
+                      height: int = 51, slack: float = 0.1,
+                      seed: int = 0) -> str:
+    """
+    This function generates a district with houses and batteries on
+    different cells, the batteries together have slack more capacity
+    than the houses need. A district that exists is not generated again
+
+    Args:
+        houses (int): number of houses
+        batteries (int): number of batteries, at least MIN_BATTERIES
+        width (int): width of the grid
+        height (int): height of the grid
+        slack (float): fraction of spare capacity of the batteries
+        seed (int): seed of the district
+
+    Returns:
+        str: name of the district
+    """
+
+    if batteries < MIN_BATTERIES:
+        raise ValueError('a district needs at least {} batteries'.format(MIN_BATTERIES))
+
+    if houses + batteries > width * height:
+        raise ValueError('not enough cells for the houses and batteries')
+
+    name = district_name(houses, batteries, width, height, slack, seed)
+
+    if os.path.exists(csv_path(name, 'batteries')):
+        return name
+
+    rng = np.random.default_rng(seed)
+
+    # different cells for all houses and batteries
+    cells = rng.choice(width * height, houses + batteries, replace=False)
+    x, y = cells // height, cells % height
+
+    energy = rng.uniform(MIN_ENERGY, MAX_ENERGY, houses)
+    capacity = round(energy.sum() * (1 + slack) / batteries, 1)
+
+    os.makedirs(os.path.join(DATA_PATH, 'district_' + name), exist_ok=True)
+
+    # the same layout as the bundled csv files
+    with open(csv_path(name, 'houses'), 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['x', 'y', 'maxoutput'])
+        for i in range(houses):
+            writer.writerow([x[i], y[i], energy[i]])
+
+    with open(csv_path(name, 'batteries'), 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['positie', 'capaciteit'])
+        for i in range(houses, houses + batteries):
+            writer.writerow(['{},{}'.format(x[i], y[i]), capacity])
+
+    return name
@@ -0,0 +1,16 @@
+"""
+The modules of the smartgrid are imported from the root of the repository
+and the districts are read relative to it
+"""
+
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+@pytest.fixture(autouse=True)
+def root(monkeypatch):
+    monkeypatch.chdir(ROOT)
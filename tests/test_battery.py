@@ -0,0 +1,24 @@
+import random
+import pytest
+import smartgrid
+import smartgrid2
+
+def assert_energy(battery):
+    # the remaining energy is the capacity minus the connected houses, once
+    used = sum(house.energy for house in battery.houses)
+    assert battery.energy == pytest.approx(battery.capacity - used)
+    assert all(house.connection is battery for house in battery.houses)
+
+@pytest.mark.parametrize('district', [1, 2, 3])
+def test_energy_after_linking(district):
+    for model in (smartgrid.SmartGrid(district), smartgrid2.SmartGrid(district, iteration=0)):
+        for battery in model.batteries:
+            assert_energy(battery)
+
+def test_energy_after_optimization():
+    random.seed(0)
+    model = smartgrid2.SmartGrid(1, iteration=50)
+
+    for battery in model.batteries:
+        assert_energy(battery)
+        assert battery.energy >= 0
@@ -0,0 +1,32 @@
+import json
+import pytest
+import benchmark
+import district
+import synthetic
+
+@pytest.fixture
+def data_path(tmp_path, monkeypatch):
+    # the synthetic districts are written to a temporary directory
+    monkeypatch.setattr(district, 'DATA_PATH', str(tmp_path))
+    monkeypatch.setattr(synthetic, 'DATA_PATH', str(tmp_path))
+    return tmp_path
+
+def test_district_needs_batteries(data_path):
+    with pytest.raises(ValueError):
+        synthetic.generate_district(batteries=synthetic.MIN_BATTERIES - 1)
+    with pytest.raises(ValueError):
+        synthetic.generate_district(houses=100, width=10, height=10)
+
+    # nothing is written for a district that is refused
+    assert list(data_path.iterdir()) == []
+
+def test_run_benchmarks(data_path, capsys):
+    output = str(data_path / 'benchmark.json')
+    results = benchmark.run_benchmarks(output, [(150, 5, 51)], iteration=10)
+
+    # the rows are returned and written, not printed
+    assert capsys.readouterr().out == ''
+    with open(output) as report:
+        assert json.load(report)['results'] == results
+    assert set(benchmark.STAGES) <= set(results[0]['timings'])
+    assert results[0]['not_placed'] == 0
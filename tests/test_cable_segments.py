@@ -0,0 +1,47 @@
+import json
+import os
+import random
+import pytest
+import smartgrid
+from cable_segments import CableSegments
+
+def random_walk(rng, size):
+    # a path of neighbouring cells with turns and jumps, every cell once
+    x, y = rng.randrange(50), rng.randrange(50)
+    path = {(x, y): None}
+
+    while len(path) < size:
+        if rng.random() < 0.1:
+            x, y = rng.randrange(50), rng.randrange(50)
+        else:
+            dx, dy = rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+            x, y = x + dx, y + dy
+        path[(x, y)] = None
+
+    return list(path)
+
+def test_segments_keep_the_cells():
+    rng = random.Random(0)
+    segments = CableSegments()
+    added = {}
+
+    for house_id in range(1, 40):
+        battery_id = rng.randrange(1, 4)
+        path = random_walk(rng, rng.randrange(1, 60))
+        added[house_id] = path
+
+        assert segments.add(battery_id, path, house_id) == len(path)
+
+    # the cells come back in the order in which they were added
+    assert segments.cells_by_house() == added
+    assert all(segments.cells(house_id=house_id) == path
+               for house_id, path in added.items())
+    assert segments.num_cables() == sum(len(path) for path in added.values())
+
+@pytest.mark.parametrize('district', [1, 2, 3])
+def test_export_like_cable_agents(district):
+    # the export of the smartgrid when every cable was a Cable agent
+    with open(os.path.join('tests', 'data', 'smartgrid_district{}.json'.format(district))) as fixture:
+        expected = json.load(fixture)
+
+    assert smartgrid.SmartGrid(district).information == expected
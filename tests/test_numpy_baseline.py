@@ -0,0 +1,25 @@
+import numpy as np
+from numpy_baseline import count_cables, assign_random
+
+def route(house, battery):
+    # horizontal along the house, then vertical to the battery
+    (house_x, house_y), (battery_x, battery_y) = house, battery
+    cells = {(x, house_y) for x in range(min(house_x, battery_x), max(house_x, battery_x) + 1)}
+    cells |= {(battery_x, y) for y in range(min(house_y, battery_y), max(house_y, battery_y) + 1)}
+    return cells
+
+def test_count_cables():
+    rng = np.random.default_rng(0)
+    houses = rng.integers(20, size=(30, 2))
+    batteries = rng.integers(20, size=(3, 2))
+    assignment, failed = assign_random(np.ones(30), np.full(3, 12.0), 50, rng)
+    
+    # a small block counts the runs in several blocks
+    cables = count_cables(assignment[~failed], houses, batteries, 20, 20, block=5000)
+    
+    for run, count in zip(assignment[~failed], cables):
+        cells = set()
+        for house, battery in enumerate(run):
+            cells |= {(battery,) + cell for cell in route(houses[house], batteries[battery])}
+        
+        assert count == len(cells)
@@ -0,0 +1,50 @@
+import random
+import pytest
+from numpy_distances import PathArray, dist_paths
+from path_index import PathIndex
+from lay_cables import merge_all_paths
+from smartgrid2 import SmartGrid
+
+def random_path(rng, size):
+    return [(rng.randrange(50), rng.randrange(50)) for _ in range(size)]
+
+def brute_force(path_1, path_2):
+    return min(abs(x_1 - x_2) + abs(y_1 - y_2)
+               for x_1, y_1 in path_1 for x_2, y_2 in path_2)
+
+def test_dist_paths():
+    rng = random.Random(0)
+    
+    for _ in range(200):
+        path_1 = random_path(rng, rng.randrange(1, 30))
+        path_2 = random_path(rng, rng.randrange(1, 30))
+        dist, point_1, point_2 = dist_paths(path_1, path_2)
+        
+        # the closest points are on the paths and the first minimum
+        assert dist == brute_force(path_1, path_2)
+        assert point_1 in path_1 and point_2 in path_2
+        assert abs(point_1[0] - point_2[0]) + abs(point_1[1] - point_2[1]) == dist
+
+def test_path_array_like_path_index():
+    rng = random.Random(1)
+    
+    for _ in range(200):
+        path_1 = random_path(rng, rng.randrange(1, 80))
+        path_2 = random_path(rng, rng.randrange(1, 80))
+        bound = rng.choice([-1, 1, 5, 20])
+        
+        assert (PathArray(path_2).dist(path_1, bound)[0] ==
+                PathIndex(path_2).dist(path_1, bound)[0])
+
+@pytest.mark.parametrize('district', [1, 2, 3])
+def test_merge_engines(district):
+    model = SmartGrid(district, iteration=0)
+    
+    for battery in model.batteries:
+        # the paths of the houses, not the merged path of the laid cables
+        all_paths = [[(battery.x, battery.y)]]
+        all_paths += [[point] for point in battery.path_map.values()]
+        merged = [merge_all_paths(all_paths, engine)
+                  for engine in ('scalar', 'numpy')]
+        
+        assert merged[0] == merged[1]
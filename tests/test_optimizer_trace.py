@@ -0,0 +1,74 @@
+import csv
+import json
+import os
+import random
+import pytest
+from optimizer_trace import FIELDS, TraceWriter, chain_path, open_trace
+from smartgrid2 import SmartGrid
+
+def rows(n):
+    return [(i, 1 / (i + 1), 30000 + i, 30100 - i, i % 2 == 0, 30000)
+            for i in range(n)]
+
+def read_trace(path):
+    with open(path) as trace_file:
+        if path.endswith('.jsonl'):
+            return [tuple(json.loads(line)[field] for field in FIELDS)
+                    for line in trace_file]
+
+        reader = csv.reader(trace_file)
+        assert tuple(next(reader)) == FIELDS
+        return [(int(i), float(temperature), int(old), int(new),
+                 accepted == 'True', int(best))
+                for i, temperature, old, new, accepted, best in reader]
+
+@pytest.mark.parametrize('name', ['trace.csv', 'trace.jsonl'])
+def test_rows_read_back(name, tmp_path):
+    path = str(tmp_path / name)
+
+    with TraceWriter(path) as writer:
+        for row in rows(500):
+            writer.write(*row)
+
+    assert writer.rows == 500
+    assert read_trace(path) == rows(500)
+
+def test_buffered_until_close(tmp_path):
+    path = str(tmp_path / 'trace.csv')
+    writer = TraceWriter(path)
+
+    for row in rows(1000):
+        writer.write(*row)
+
+    # the rows stay in the buffer, closing writes them
+    assert os.path.getsize(path) == 0
+    writer.close()
+    assert read_trace(path) == rows(1000)
+
+    # a small buffer is written while the rows come in
+    writer = TraceWriter(path, buffer_size=64)
+    for row in rows(1000):
+        writer.write(*row)
+    assert os.path.getsize(path) > 0
+    writer.close()
+
+def test_paths():
+    assert open_trace(None) is None
+    assert chain_path(None, 1) is None
+    assert chain_path('trace.csv', 2) == 'trace-chain2.csv'
+    assert chain_path(os.path.join('out', 'trace.jsonl'), 0) == os.path.join('out', 'trace-chain0.jsonl')
+
+def test_trace_of_the_optimizers(tmp_path):
+    random.seed(0)
+    model = SmartGrid(1, iteration=50, trace=str(tmp_path / 'trace.jsonl'))
+    stats = model.anneal_stats
+
+    # a row per swap which is not skipped
+    trace = read_trace(str(tmp_path / 'trace.jsonl'))
+    assert len(trace) == stats['accepted'] + stats['rejected']
+    assert trace[-1][5] == stats['costs']
+
+    # every chain writes its own file
+    SmartGrid(1, iteration=20, chains=2, trace=str(tmp_path / 'chains.csv'))
+    assert sorted(os.listdir(tmp_path)) == ['chains-chain0.csv', 'chains-chain1.csv',
+                                            'trace.jsonl']
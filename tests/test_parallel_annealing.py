@@ -0,0 +1,81 @@
+import random
+from math import exp
+import pytest
+from parallel_annealing import (accept_exchange, multi_chain_optimization,
+                                replica_exchange_optimization, temperature_ladder)
+from simulated_annealing import anneal
+from smartgrid2 import SmartGrid
+from solution_state import SolutionState
+
+def single_chain(seed, iteration):
+    # the chain of a seed, annealed in this process
+    state = SolutionState.from_model(SmartGrid(1, iteration=0))
+    random.seed(seed)
+    stats = anneal(state, iteration)
+    return stats, state.get_selection()
+
+def test_chains_like_single_chain():
+    model = SmartGrid(1, iteration=0)
+    results = multi_chain_optimization(model, 100, chains=3, seed=3, workers=2)
+
+    # every chain has its own seed and anneals like a single chain
+    assert len({result['seed'] for result in results}) == 3
+    for result in results:
+        stats, selection = single_chain(result['seed'], 100)
+        assert result['costs'] == stats['costs']
+        assert result['selection'] == selection
+        assert result['costs'] <= result['initial']
+
+    # the model gets the best chain
+    best = min(results, key=lambda x: x['costs'])
+    assert model.costs() == best['costs']
+    assert SolutionState.from_model(model).get_selection() == best['selection']
+
+def test_chains_seeded():
+    costs = []
+
+    for _ in range(2):
+        model = SmartGrid(1, iteration=0)
+        results = multi_chain_optimization(model, 50, chains=2, seed=5, workers=2)
+        costs.append([(result['seed'], result['costs']) for result in results])
+
+    assert costs[0] == costs[1]
+
+def test_temperature_ladder():
+    temperatures = temperature_ladder(5.0, 200.0, 4)
+    ratios = [hot / cold for cold, hot in zip(temperatures, temperatures[1:])]
+
+    assert temperatures[0] == pytest.approx(5.0)
+    assert temperatures[-1] == pytest.approx(200.0)
+    assert ratios == pytest.approx([40 ** (1 / 3)] * 3)
+
+def test_accept_exchange():
+    rng = random.Random(0)
+
+    # the colder replica always takes the cheaper selection
+    assert all(accept_exchange(31000, 30000, 5.0, 10.0, rng) for _ in range(100))
+    assert all(accept_exchange(30000, 30000, 5.0, 10.0, rng) for _ in range(100))
+
+    # otherwise with the probability of the Metropolis criterion
+    probability = exp((30000 - 30010) * (1 / 5.0 - 1 / 10.0))
+    accepted = sum(accept_exchange(30000, 30010, 5.0, 10.0, rng) for _ in range(10000))
+    assert accepted / 10000 == pytest.approx(probability, abs=0.02)
+
+@pytest.mark.parametrize('iteration, sweeps', [(30, 1), (120, 3)])
+def test_replica_iterations(iteration, sweeps):
+    runs = []
+
+    for _ in range(2):
+        model = SmartGrid(1, iteration=0)
+        stats = replica_exchange_optimization(model, iteration, replicas=3,
+                                              sweep=50, seed=4, workers=2)
+        runs.append(stats)
+
+        # every replica runs the asked iterations, the last sweep is shorter
+        assert stats['sweeps'] == sweeps
+        assert [sum(counts) for counts in zip(stats['accepted'], stats['rejected'],
+                                              stats['skipped'])] == [iteration] * 3
+        assert model.costs() == stats['costs'] <= stats['initial']
+
+    # the same seed gives the same replicas
+    assert runs[0] == runs[1]
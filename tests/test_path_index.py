@@ -0,0 +1,48 @@
+import random
+import pytest
+from path_index import PathIndex
+
+def random_path(rng, size, width):
+    return [(rng.randrange(width), rng.randrange(width)) for _ in range(size)]
+
+def brute_force(path_1, path_2):
+    return min(abs(x_1 - x_2) + abs(y_1 - y_2)
+               for x_1, y_1 in path_1 for x_2, y_2 in path_2)
+
+# small indexes are scanned, big and sparse ones are searched by bucket
+@pytest.mark.parametrize('size, width', [(10, 50), (200, 50), (200, 500)])
+def test_dist(size, width):
+    rng = random.Random(size + width)
+
+    for _ in range(100):
+        path_1 = random_path(rng, rng.randrange(1, 40), width)
+        path_2 = random_path(rng, rng.randrange(1, size), width)
+        dist, point_1, point_2 = PathIndex(path_2).dist(path_1)
+
+        assert dist == brute_force(path_1, path_2)
+        assert point_1 in path_1 and point_2 in path_2
+        assert abs(point_1[0] - point_2[0]) + abs(point_1[1] - point_2[1]) == dist
+
+@pytest.mark.parametrize('size, width', [(10, 50), (200, 50), (200, 500)])
+def test_dist_bound(size, width):
+    rng = random.Random(size * width)
+
+    for _ in range(100):
+        path_1 = random_path(rng, rng.randrange(1, 40), width)
+        path_2 = random_path(rng, rng.randrange(1, size), width)
+        expected = brute_force(path_1, path_2)
+        bound = rng.randrange(1, 2 * expected + 2)
+
+        # only distances smaller than the bound are found
+        dist = PathIndex(path_2).dist(path_1, bound)[0]
+        assert dist == (expected if expected < bound else -1)
+
+def test_nearest():
+    rng = random.Random(2)
+    index = PathIndex(random_path(rng, 300, 200))
+
+    for point in random_path(rng, 200, 200):
+        dist, other = index.nearest(point)
+
+        assert dist == brute_force([point], index.points)
+        assert other in index.seen
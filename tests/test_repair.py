@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+import district
+import synthetic
+from repair import repair_assignment
+from smartgrid2 import SmartGrid
+
+def assert_all_placed(model):
+    assert model.houses_not_placed == []
+    assert all(house.connection is not None for house in model.houses)
+    assert all(battery.energy >= 0 for battery in model.batteries)
+
+def test_ejection_chain():
+    # the big house only fits when the house of battery 0 moves to battery 1
+    dist = np.zeros((3, 2))
+    energy = np.array([5.0, 5.0, 6.0])
+    remaining = np.array([5.0, 5.0])
+    assignment = np.array([0, 1, -1])
+    
+    assert repair_assignment(dist, energy, remaining, assignment) == []
+    assert (assignment != -1).all() and (remaining >= 0).all()
+
+@pytest.mark.parametrize('number', [1, 2, 3])
+def test_districts_all_placed(number):
+    assert_all_placed(SmartGrid(number, iteration=0))
+
+@pytest.mark.parametrize('slack', [0.01, 0.02, 0.05])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_slack_districts_all_placed(slack, seed, tmp_path, monkeypatch):
+    # the synthetic districts are written to a temporary directory
+    monkeypatch.setattr(district, 'DATA_PATH', str(tmp_path))
+    monkeypatch.setattr(synthetic, 'DATA_PATH', str(tmp_path))
+    name = synthetic.generate_district(slack=slack, seed=seed)
+    
+    assert_all_placed(SmartGrid(name, iteration=0))
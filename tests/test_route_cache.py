@@ -0,0 +1,108 @@
+from lay_cables import get_path, merged_cells
+from route_cache import RouteCache, PathCache
+
+def paths(i):
+    return [[(0, 0)], [(i, 1)], [(1, i)]]
+
+def test_route_cache_eviction():
+    cache = RouteCache(maxsize=3)
+
+    for i in range(3):
+        cache.put(cache.key(paths(i)), [(i, i)])
+
+    # using the first battery keeps it, the least recently used is forgotten
+    assert cache.get(cache.key(paths(0))) == [(0, 0)]
+    cache.put(cache.key(paths(3)), [(3, 3)])
+
+    assert len(cache) == 3
+    assert cache.get(cache.key(paths(1))) is None
+    assert cache.get(cache.key(paths(0))) == [(0, 0)]
+    assert cache.get(cache.key(paths(3))) == [(3, 3)]
+    assert cache.info() == {'hits': 3, 'misses': 1, 'hit_rate': 0.75,
+                            'size': 3, 'maxsize': 3}
+
+def test_route_cache_resize_and_disable():
+    cache = RouteCache(maxsize=4)
+
+    for i in range(4):
+        cache.put(cache.key(paths(i)), [(i, i)])
+
+    cache.resize(2)
+    assert len(cache) == 2 and cache.get(cache.key(paths(1))) is None
+    assert cache.get(cache.key(paths(3))) == [(3, 3)]
+
+    cache.resize(0)
+    cache.put(cache.key(paths(5)), [(5, 5)])
+    assert len(cache) == 0
+
+def test_route_cache_key():
+    # the order of the paths, the router and the engine decide the route
+    cache = RouteCache()
+
+    assert cache.key(paths(1)) != cache.key(paths(1)[::-1])
+    assert cache.key(paths(1), 'greedy') != cache.key(paths(1), 'steiner')
+    assert cache.key(paths(1), engine='scalar') != cache.key(paths(1), engine='numpy')
+
+def test_merged_cells_cached():
+    cache = RouteCache()
+    all_paths = [[(0, 0)], [(5, 3)], [(2, 7)], [(6, 6)]]
+    cells = merged_cells(all_paths, cache)
+
+    assert merged_cells(all_paths, cache) is cells
+    assert merged_cells(all_paths, RouteCache(maxsize=0)) == cells
+    assert cache.info()['hits'] == 1
+
+def line(i, length):
+    return [(i, y) for y in range(length)]
+
+def test_path_cache_eviction_by_cells():
+    cache = PathCache(maxcells=10)
+
+    for i in range(3):
+        cache.put(i, line(i, 3))
+
+    # the fourth path needs room, the least recently used paths go first
+    assert cache.get(0) == tuple(line(0, 3))
+    cache.put(3, line(3, 4))
+
+    assert cache.num_cells == 10 and len(cache) == 3
+    assert cache.get(1) is None
+    assert cache.get(0) == tuple(line(0, 3))
+
+    cache.put(4, line(4, 8))
+    assert cache.num_cells <= 10
+    assert cache.get(3) is None and cache.get(0) is None
+    assert cache.get(4) == tuple(line(4, 8))
+    assert cache.num_cells == sum(len(path) for path in cache.paths.values())
+
+def test_path_cache_limits():
+    cache = PathCache(maxcells=5)
+
+    # a path with more cells than the cache is not remembered
+    assert cache.put(0, line(0, 6)) == tuple(line(0, 6))
+    assert len(cache) == 0 and cache.num_cells == 0
+
+    cache.put(1, line(1, 3))
+    cache.put(2, line(2, 2))
+    cache.resize(2)
+    assert cache.num_cells == 2 and cache.get(1) is None
+
+    cache.resize(0)
+    cache.put(3, line(3, 1))
+    assert len(cache) == 0 and cache.num_cells == 0
+
+def test_path_cache_shares_cells():
+    cache = PathCache()
+    path_1 = cache.put(1, [(0, 0), (0, 1), (1, 1)])
+    path_2 = cache.put(2, [(1, 1), (0, 1)])
+
+    assert path_2[0] is path_1[2] and path_2[1] is path_1[1]
+    assert cache.info()['cells'] == 5
+
+def test_get_path_cached():
+    cache = PathCache()
+    path = get_path((1, 2), (4, 6), True, cache)
+
+    assert get_path((1, 2), (4, 6), True, cache) is path
+    assert get_path((1, 2), (4, 6), True, PathCache(maxcells=0)) == path
+    assert cache.info()['hits'] == 1 and cache.info()['misses'] == 1
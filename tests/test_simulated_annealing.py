@@ -0,0 +1,82 @@
+import random
+import pytest
+from simulated_annealing import anneal
+from smartgrid2 import SmartGrid
+from solution_state import SolutionState
+
+def annealed_costs(seed, incremental):
+    random.seed(seed)
+    return SmartGrid(1, iteration=100, incremental=incremental).costs()
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_incremental_like_full(seed):
+    # the incremental annealing swaps like the full optimization
+    assert annealed_costs(seed, True) == annealed_costs(seed, False)
+
+def test_anneal_never_worse():
+    random.seed(0)
+    model = SmartGrid(1, iteration=100)
+    stats = model.anneal_stats
+
+    assert stats['costs'] <= stats['initial']
+    assert model.costs() == stats['costs']
+    assert stats['iterations'] == 100
+    assert stats['accepted'] + stats['rejected'] + stats['skipped'] == 100
+
+class Interrupt:
+    # a trace which is interrupted at a number of rows
+    def __init__(self, rows):
+        self.rows = rows
+        self.iteration = None
+
+    def write(self, iteration, *row):
+        self.rows -= 1
+        if self.rows == 0:
+            self.iteration = iteration
+            raise KeyboardInterrupt
+
+@pytest.fixture
+def state():
+    return SolutionState.from_model(SmartGrid(1, iteration=0))
+
+def assert_best(state, stats):
+    # the state is left with the best selection so far
+    assert state.costs() == stats['costs'] <= stats['initial']
+
+def test_stop_patience(state):
+    random.seed(0)
+    stats = anneal(state, None, patience=30)
+
+    assert stats['stopped'] == 'patience'
+    assert stats['iterations'] >= 30
+    assert_best(state, stats)
+
+def test_stop_time(state):
+    random.seed(0)
+    stats = anneal(state, None, time_budget=0.2)
+
+    assert stats['stopped'] == 'time'
+    assert stats['iterations'] > 0
+    assert_best(state, stats)
+
+def test_stop_interrupted(state):
+    random.seed(0)
+    trace = Interrupt(50)
+    stats = anneal(state, 1000, trace=trace)
+
+    assert stats['stopped'] == 'interrupted'
+    assert stats['iterations'] == trace.iteration < 1000
+    assert_best(state, stats)
+
+def test_stop_iterations(state):
+    random.seed(0)
+    stats = anneal(state, 40, time_budget=60, patience=1000)
+
+    assert stats['stopped'] == 'iterations'
+    assert stats['iterations'] == 40
+
+def test_replicas_without_patience_or_trace():
+    with pytest.raises(ValueError):
+        SmartGrid(1, iteration=10, replicas=2, patience=5)
+    with pytest.raises(ValueError):
+        SmartGrid(1, iteration=10, replicas=2, trace='trace.csv')
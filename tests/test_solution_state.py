@@ -0,0 +1,73 @@
+import random
+import numpy as np
+import pytest
+from smartgrid2 import SmartGrid
+from solution_state import SolutionState
+
+def get_state(state):
+    # the remaining capacity is compared rounded, adding and removing the
+    # energy of a house is not exact in floats
+    return (state.get_assignment(), np.round(state.remaining, 6).tolist(),
+            state.get_selection(), [list(cells) for cells in state.cells],
+            state.num_cables.tolist(), state.costs())
+
+def random_pair(rng, state):
+    house_1, house_2 = rng.sample(range(len(state.house_points)), 2)
+    while state.assignment[house_1] == state.assignment[house_2]:
+        house_1, house_2 = rng.sample(range(len(state.house_points)), 2)
+    return house_1, house_2
+
+@pytest.fixture(scope='module')
+def model():
+    return SmartGrid(1, iteration=0)
+
+def test_swap_undo(model):
+    rng = random.Random(0)
+    state = SolutionState.from_model(model)
+    before = get_state(state)
+
+    for _ in range(30):
+        house_1, house_2 = random_pair(rng, state)
+        battery_1, battery_2 = state.assignment[house_1], state.assignment[house_2]
+        record = state.swap(house_1, house_2)
+
+        # the houses changed batteries and the cables are laid again
+        assert (state.assignment[house_1], state.assignment[house_2]) == (battery_2, battery_1)
+        swapped = SolutionState.from_model(model)
+        swapped.set_selection(state.get_selection())
+        assert get_state(swapped) == get_state(state)
+
+        # undo goes back to exactly the same houses, paths and cables
+        state.undo(record)
+        assert get_state(state) == before
+
+def test_swaps_undone_in_reverse(model):
+    rng = random.Random(1)
+    state = SolutionState.from_model(model)
+    before = get_state(state)
+    records = [state.swap(*random_pair(rng, state)) for _ in range(20)]
+
+    for record in reversed(records):
+        state.undo(record)
+
+    assert get_state(state) == before
+
+def test_snapshot_restore(model):
+    rng = random.Random(2)
+    state = SolutionState.from_model(model)
+    snapshot = state.snapshot()
+    before = get_state(state)
+
+    for _ in range(20):
+        state.swap(*random_pair(rng, state))
+
+    state.restore(snapshot)
+    assert get_state(state) == before
+
+    # the snapshot is not changed by the state after a restore
+    state.swap(*random_pair(rng, state))
+    state.restore(snapshot)
+    assert get_state(state) == before
+    assert np.allclose(state.remaining, state.capacity -
+                       np.bincount(state.assignment, state.house_energy,
+                                   len(state.capacity)))
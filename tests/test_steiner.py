@@ -0,0 +1,64 @@
+import random
+import pytest
+import lay_cables
+from lay_cables import greedy_cells, shortest_cells
+from steiner import MAX_TERMINALS, steiner_cells
+
+def random_paths(rng, size, width=30):
+    points = rng.sample([(x, y) for x in range(width) for y in range(width)], size)
+    return [[point] for point in points]
+
+def components(cells):
+    # number of groups of neighbouring cells
+    cells, count = set(cells), 0
+
+    while cells:
+        count += 1
+        stack = [cells.pop()]
+        while stack:
+            x, y = stack.pop()
+            for cell in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if cell in cells:
+                    cells.remove(cell)
+                    stack.append(cell)
+
+    return count
+
+@pytest.mark.parametrize('size', [1, 2, 3, 8, 20])
+def test_steiner_connects_terminals(size):
+    rng = random.Random(size)
+
+    for _ in range(20):
+        all_paths = random_paths(rng, size)
+        cells = steiner_cells(all_paths)
+
+        # every terminal once, the battery first, as one tree
+        assert cells[0] == all_paths[0][0]
+        assert len(cells) == len(set(cells))
+        assert all(path[0] in cells for path in all_paths)
+        assert components(cells) == 1
+
+def test_shortest_never_longer_than_greedy():
+    rng = random.Random(0)
+
+    for _ in range(100):
+        all_paths = random_paths(rng, rng.randrange(2, 25))
+        greedy = greedy_cells(all_paths)
+        shortest = shortest_cells(all_paths)
+
+        assert len(shortest) <= len(greedy)
+        assert set(point for path in all_paths for point in path) <= set(shortest)
+        assert components(shortest) == 1
+
+def test_greedy_above_max_terminals(monkeypatch):
+    def no_steiner(all_paths, batch=0):
+        raise AssertionError('routed as a Steiner tree')
+
+    monkeypatch.setattr(lay_cables, 'steiner_cells', no_steiner)
+    all_paths = random_paths(random.Random(1), MAX_TERMINALS + 1, 40)
+
+    assert shortest_cells(all_paths) == greedy_cells(all_paths)
+
+    # at the limit the Steiner tree is still tried
+    with pytest.raises(AssertionError):
+        shortest_cells(all_paths[:MAX_TERMINALS])
@@ -31,7 +31,7 @@ if __name__ == "__main__":
     grid = mesa.visualization.CanvasGrid(agent_portrayal, 51, 51, 510, 510)
 
     server = mesa.visualization.ModularServer(
-        SmartGrid, [grid], "Smart Grid", {"district": 1}
+        SmartGrid, [grid], "Smart Grid", {"district": 1, "cable_agents": True}
     )
     server.port = 8521  # The default
     server.launch()
\ No newline at end of file